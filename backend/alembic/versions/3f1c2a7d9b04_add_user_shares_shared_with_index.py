@@ -0,0 +1,28 @@
+"""Add index for reverse calendar-sharing lookups
+
+Revision ID: 3f1c2a7d9b04
+Revises: 924ac8750348
+Create Date: 2026-10-15 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7d9b04'
+down_revision: Union[str, Sequence[str], None] = '924ac8750348'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_shares_shared_with_id', 'user_shares', ['shared_with_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_shares_shared_with_id', table_name='user_shares', if_exists=True)
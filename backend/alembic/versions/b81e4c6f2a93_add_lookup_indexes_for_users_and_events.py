@@ -0,0 +1,34 @@
+"""Add lookup indexes for users and events
+
+Revision ID: b81e4c6f2a93
+Revises: 3f1c2a7d9b04
+Create Date: 2026-10-15 11:02:17.384921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e4c6f2a93'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a7d9b04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Names match what index=True on the models generates, so databases
+    # originally built with create_all() are left untouched
+    op.create_index('ix_users_email', 'users', ['email'], unique=True, if_not_exists=True)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True, if_not_exists=True)
+    op.create_index('ix_events_owner_id', 'events', ['owner_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_owner_id', table_name='events', if_exists=True)
+    op.drop_index('ix_users_username', table_name='users', if_exists=True)
+    op.drop_index('ix_users_email', table_name='users', if_exists=True)
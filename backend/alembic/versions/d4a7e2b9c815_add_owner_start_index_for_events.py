@@ -0,0 +1,31 @@
+"""Add owner/start_time index for events
+
+Revision ID: d4a7e2b9c815
+Revises: b81e4c6f2a93
+Create Date: 2026-10-15 14:26:51.207318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7e2b9c815'
+down_revision: Union[str, Sequence[str], None] = 'b81e4c6f2a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_owner_start', 'events', ['owner_id', 'start_time'], unique=False, if_not_exists=True)
+    # owner_id is the leading column of the new index, so the single-column one is redundant
+    op.drop_index('ix_events_owner_id', table_name='events', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_events_owner_id', 'events', ['owner_id'], unique=False, if_not_exists=True)
+    op.drop_index('ix_events_owner_start', table_name='events', if_exists=True)
@@ -2,12 +2,15 @@
 # POST/register, POST/login, GET/me, PUT/me, DELETE/me
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, or_
 from sqlalchemy.orm import Session
 from app.utils.auth import get_current_user, verify_password, get_password_hash, create_access_token
 from database import get_db
-from app.models.user import User
+from app.models.user import User, user_shares
+from app.models.events import Event
 from schemas import Token, UserCreate, UserResponse, UserUpdate, UserLogin
 from datetime import timedelta
+from app.core.cache import USERS_CACHE_KEY, cache_delete, user_cache_key
 from app.core.logging import get_logger
 from app.models.user import User
 from app.utils.auth import get_current_user
@@ -20,16 +23,15 @@ router = APIRouter()
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    # Check email and username in one round-trip, then work out which one clashed
+    existing_user = db.query(User.email, User.username).filter(
+        or_(User.email == user_data.email, User.username == user_data.username)
+    ).first()
     if existing_user:
-        logger.warning(f"User with email {user_data.email} already exists.")
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    
-    # Check if username already exists
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
-    if existing_username:
-        logger.warning(f"Username {user_data.username} already exists.")
+        if existing_user.email == user_data.email:
+            logger.warning("User with email %s already exists.", user_data.email)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+        logger.warning("Username %s already exists.", user_data.username)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken")
     
     # Hash the password and create user
@@ -43,30 +45,27 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     
     db.add(new_user)
     db.commit()
-    db.refresh(new_user)
-    logger.info(f"User {new_user.email} registered successfully.")
+    cache_delete(USERS_CACHE_KEY)
+    logger.info("User %s registered successfully.", new_user.email)
     return new_user
 
 @router.post("/login", response_model=Token)
 def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
     """Login a user and return JWT token."""
-    # Find user by email
-    db_user = db.query(User).filter(User.email == user_data.email).first()
+    # Find user by email - only the columns needed to check the password and mint the token
+    db_user = db.query(User.username, User.hashed_password).filter(User.email == user_data.email).first()
     
     if not db_user:
-        logger.warning(f"User not found for email {user_data.email}.")
+        logger.warning("User not found for email %s.", user_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Explicitly get the password hash as string
-    stored_password_hash = str(db_user.hashed_password)
-    
-    # Verify password
-    if not verify_password(user_data.password, stored_password_hash):
-        logger.warning(f"Invalid password for email {user_data.email}.")
+    # Verify password (hashed_password is already a str column)
+    if not verify_password(user_data.password, db_user.hashed_password):
+        logger.warning("Invalid password for email %s.", user_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -80,13 +79,14 @@ def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
         expires_delta=access_token_expires
     )
     
-    logger.info(f"User {user_data.email} logged in successfully.")
+    logger.info("User %s logged in successfully.", user_data.email)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get the current logged-in user's information."""
-    logger.info(f"Retrieved current user info for {current_user.email}.")
+    # No I/O here, so run on the event loop instead of taking a threadpool hop
+    logger.info("Retrieved current user info for %s.", current_user.email)
     return current_user
 
 @router.put("/me", response_model=UserResponse)
@@ -96,59 +96,73 @@ def update_user_info(
     db: Session = Depends(get_db)
 ):
     """Update the current user's information."""
+    # Only fields that actually change need a conflict check or an UPDATE. email is required
+    # on UserUpdate, so it usually arrives unchanged
+    new_username = user_data.username if user_data.username and user_data.username != current_user.username else None
+    new_email = user_data.email if user_data.email and user_data.email != current_user.email else None
+    if not (new_username or new_email or user_data.password):
+        return current_user
     
     update_data = {}
     
-    # Check and prepare username update
-    if user_data.username:
-        existing_user = db.query(User).filter(
-            User.username == user_data.username,
-            User.id != current_user.id
-        ).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-        update_data['username'] = user_data.username
-        update_data['name'] = user_data.username  # Update name field too
+    # Check username and email conflicts with other users in a single query
+    conflict_filters = []
+    if new_username:
+        conflict_filters.append(User.username == new_username)
+    if new_email:
+        conflict_filters.append(User.email == new_email)
     
-    # Check and prepare email update
-    if user_data.email:
-        existing_user = db.query(User).filter(
-            User.email == user_data.email,
+    if conflict_filters:
+        existing_user = db.query(User.username, User.email).filter(
+            or_(*conflict_filters),
             User.id != current_user.id
         ).first()
         if existing_user:
+            if new_username and existing_user.username == new_username:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Username already taken"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already taken"
             )
-        update_data['email'] = user_data.email
+    
+    # Prepare username update
+    if new_username:
+        update_data['username'] = new_username
+        update_data['name'] = new_username  # Update name field too
+    
+    # Prepare email update
+    if new_email:
+        update_data['email'] = new_email
     
     # Check and prepare password update
     if user_data.password:
         hashed_password = get_password_hash(user_data.password)
         update_data['hashed_password'] = hashed_password
-        logger.debug(f"User {current_user.email} updated password successfully.")
-    
-    # Perform the update if there's data to update
-    if update_data:
-        db.query(User).filter(User.id == current_user.id).update(update_data)
-        db.commit()
-        
-        # Get the updated user
-        updated_user = db.query(User).filter(User.id == current_user.id).first()
-        logger.debug(f"User updated successfully.")
-        return updated_user
+        logger.debug("User %s updated password successfully.", current_user.email)
     
-    # No updates needed
+    # current_user is attached to this session, so the UPDATE is flushed on commit
+    # and the instance is already up to date - no need to re-select it
+    for key, value in update_data.items():
+        setattr(current_user, key, value)
+    db.commit()
+    if new_username or new_email:
+        cache_delete(USERS_CACHE_KEY, user_cache_key(current_user.id))
+    logger.debug("User updated successfully.")
     return current_user
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Delete the current user's account."""
-    db.delete(current_user)
+    # Bulk deletes instead of db.delete(), which loads and deletes each event one by one
+    db.query(Event).filter(Event.owner_id == current_user.id).delete(synchronize_session=False)
+    db.execute(delete(user_shares).where(
+        or_(user_shares.c.sharer_id == current_user.id, user_shares.c.shared_with_id == current_user.id)
+    ))
+    db.query(User).filter(User.id == current_user.id).delete(synchronize_session=False)
     db.commit()
-    logger.debug(f"User {current_user.email} deleted successfully.")
+    cache_delete(USERS_CACHE_KEY, user_cache_key(current_user.id))
+    logger.debug("User %s deleted successfully.", current_user.email)
     return None
\ No newline at end of file
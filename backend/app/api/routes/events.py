@@ -3,48 +3,44 @@
 # PUT /events/{id} (update event)
 # DELETE /events/{id} (delete event)
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from database import get_db
 from app.models.events import Event
 from app.core.logging import get_logger
-from schemas import EventCreate, EventResponse, EventUpdate
+from schemas import EventCreate, EventResponse, EventResponseList, EventUpdate
 from app.utils.auth import get_current_user
 from app.models.user import User
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/events", tags=["events"])
 
-def get_database_connection():
-    """Get a database connection."""
-    return get_db()
-
-@router.get("/", response_model=list[EventResponse])
-def get_events(current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+@router.get("/", response_class=Response, responses={200: {"model": list[EventResponse]}})
+def get_events(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get all events for the current user."""
     events = db.query(Event).filter(Event.owner_id == current_user.id).all()
-    if not events:
-        logger.warning(f"No events found for user {current_user.username}.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No events found")
-    logger.debug(f"Retrieved {len(events)} events for user {current_user.username}.")
-    return events
+    logger.debug("Retrieved %d events for user %s.", len(events), current_user.username)
+    # Validate and serialise the list in one pass instead of FastAPI encoding it again
+    return Response(
+        content=EventResponseList.dump_json(EventResponseList.validate_python(events, from_attributes=True)),
+        media_type="application/json",
+    )
 
 @router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
-def create_event(event: EventCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def create_event(event: EventCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Create a new event for the current user."""
     new_event = Event(**event.dict(), owner_id=current_user.id)
     db.add(new_event)
     db.commit()
-    db.refresh(new_event)
-    logger.debug(f"Event {new_event.title} created for user {current_user.username}.")
+    logger.debug("Event %s created for user %s.", new_event.title, current_user.username)
     return new_event
 
 @router.put("/{event_id}", response_model=EventResponse)
-def update_event(event_id: int, event_update: EventUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def update_event(event_id: int, event_update: EventUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Update an existing event for the current user."""
     event = db.query(Event).filter(Event.id == event_id, Event.owner_id == current_user.id).first()
     if not event:
-        logger.warning(f"Event with id {event_id} not found for user {current_user.username}.")
+        logger.warning("Event with id %s not found for user %s.", event_id, current_user.username)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     
     for key, value in event_update.dict(exclude_unset=True).items():
@@ -52,19 +48,19 @@ def update_event(event_id: int, event_update: EventUpdate, current_user: User =
     
     db.commit()
     db.refresh(event)
-    logger.debug(f"Event {event.title} updated for user {current_user.username}.")
+    logger.debug("Event %s updated for user %s.", event.title, current_user.username)
     return event
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_event(event_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def delete_event(event_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Delete an existing event for the current user."""
     event = db.query(Event).filter(Event.id == event_id, Event.owner_id == current_user.id).first()
     if not event:
-        logger.warning(f"Event with id {event_id} not found for user {current_user.username}.")
+        logger.warning("Event with id %s not found for user %s.", event_id, current_user.username)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     
     db.delete(event)
     db.commit()
-    logger.debug(f"Event {event.title} deleted for user {current_user.username}.")
+    logger.debug("Event %s deleted for user %s.", event.title, current_user.username)
     return {"detail": "Event deleted successfully"}
 
@@ -2,13 +2,15 @@
 #get - have calendars shared with you
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, load_only
 from database import get_db
-from app.models.user import User
+from app.models.user import User, user_shares
 from app.models.events import Event
-from schemas import EventResponse, EventCreate, EventUpdate
+from schemas import EventCreate, EventResponse, UserResponse
 from app.core.logging import get_logger
-from schemas import UserResponse
 from app.utils.auth import get_current_user
 
 #Logging is heavy. Trace, info, warn and error (standard) - should be able to configure what level you want. change infos to traces? would allow to debug in trace mode. live would be info. diff levels of logging at test, live etc.
@@ -17,146 +19,156 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/shared", tags=["shared"])
 
-def get_database_connection():
-    """Get a database connection."""
-    return get_db()
+# Built fresh per raise: a shared instance would carry each request's traceback into the next
+def _user_not_found(user_id: int) -> HTTPException:
+    """Log the missing user and build the 404 to raise."""
+    # stacklevel=2 so the log line points at the route, not this helper
+    logger.warning("User with id %s not found.", user_id, stacklevel=2)
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+def _calendar_not_shared(status_code: int) -> HTTPException:
+    """Build the error for reading (404) or writing (403) a calendar that isn't shared with the caller."""
+    return HTTPException(status_code=status_code, detail="Calendar not shared with you")
+
+def is_calendar_shared(db: Session, sharer_id: int, shared_with_id: int) -> bool:
+    """Check the user_shares table directly instead of loading a shared_with collection."""
+    return db.query(
+        exists().where(
+            user_shares.c.sharer_id == sharer_id,
+            user_shares.c.shared_with_id == shared_with_id
+        )
+    ).scalar()
+
+# The list routes only return UserResponse fields, so skip loading password hashes and timestamps
+_USER_RESPONSE_COLUMNS = load_only(User.id, User.username, User.email)
+
+# ON CONFLICT DO NOTHING lives on the dialect-specific insert constructs
+_INSERT_BY_DIALECT = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+def share_calendar(db: Session, sharer_id: int, shared_with_id: int) -> None:
+    """Insert a user_shares row, doing nothing if the pair is already shared."""
+    insert = _INSERT_BY_DIALECT.get(db.get_bind().dialect.name, pg_insert)
+    db.execute(
+        insert(user_shares)
+        .values(sharer_id=sharer_id, shared_with_id=shared_with_id)
+        .on_conflict_do_nothing()
+    )
+    db.commit()
+
+def unshare_calendar(db: Session, sharer_id: int, shared_with_id: int) -> int:
+    """Delete a user_shares row and return how many rows were removed."""
+    result = db.execute(
+        delete(user_shares).where(
+            user_shares.c.sharer_id == sharer_id,
+            user_shares.c.shared_with_id == shared_with_id
+        )
+    )
+    db.commit()
+    return result.rowcount
 
 @router.get("/", response_model=list[UserResponse])
-def get_shared_users(current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def get_shared_users(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get users with whom the current user's calendar is shared."""
-    shared_users = db.query(User).filter(User.shared_with.any(id=current_user.id)).all()
-    if not shared_users:
-        logger.warning(f"No users found with whom {current_user.email}'s calendar is shared.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No users found")
-    logger.debug(f"Retrieved {len(shared_users)} users with whom {current_user.email}'s calendar is shared.")
+    shared_users = db.query(User).options(_USER_RESPONSE_COLUMNS).join(
+        user_shares, user_shares.c.shared_with_id == User.id
+    ).filter(user_shares.c.sharer_id == current_user.id).all()
+    logger.debug("Retrieved %d users with whom %s's calendar is shared.", len(shared_users), current_user.email)
     return shared_users
 
 @router.post("/share/{user_id}", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def share_calendar_with_user(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def share_calendar_with_user(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Share the current user's calendar with another user."""
     user_to_share = db.query(User).filter(User.id == user_id).first()
     if not user_to_share:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    if user_to_share in current_user.shared_with:
-        logger.debug(f"{current_user.email} has already shared their calendar with {user_to_share.email}.")
-        return user_to_share
+        raise _user_not_found(user_id)
     
-    current_user.shared_with.append(user_to_share)
-    db.commit()
-    db.refresh(current_user)
-    logger.debug(f"{current_user.email} shared their calendar with {user_to_share.email}.")
+    share_calendar(db, current_user.id, user_to_share.id)
+    logger.debug("%s shared their calendar with %s.", current_user.email, user_to_share.email)
     return user_to_share
 
 @router.delete("/unshare/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def unshare_calendar_with_user(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def unshare_calendar_with_user(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Unshare the current user's calendar with another user."""
-    user_to_unshare = db.query(User).filter(User.id == user_id).first()
-    if not user_to_unshare:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    if user_to_unshare not in current_user.shared_with:
-        logger.debug(f"{current_user.email} has not shared their calendar with {user_to_unshare.email}.")
+    if not unshare_calendar(db, current_user.id, user_id):
+        if not db.query(exists().where(User.id == user_id)).scalar():
+            raise _user_not_found(user_id)
+        logger.debug("%s has not shared their calendar with user %s.", current_user.email, user_id)
         return
     
-    current_user.shared_with.remove(user_to_unshare)
-    db.commit()
-    logger.debug(f"{current_user.email} unshared their calendar with {user_to_unshare.email}.")
+    logger.debug("%s unshared their calendar with user %s.", current_user.email, user_id)
 
     return {"detail": "Calendar unshared successfully"}
 
 @router.get("/shared-with-me", response_model=list[UserResponse])
-def get_calendars_shared_with_me(current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def get_calendars_shared_with_me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get users who have shared their calendars with the current user."""
-    users_who_shared = db.query(User).filter(User.shared_with.any(id=current_user.id)).all()
-    if not users_who_shared:
-        logger.warning(f"No users found who have shared their calendars with {current_user.email}.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No users found")
-    logger.debug(f"Retrieved {len(users_who_shared)} users who have shared their calendars with {current_user.email}.")
+    users_who_shared = db.query(User).options(_USER_RESPONSE_COLUMNS).join(
+        user_shares, user_shares.c.sharer_id == User.id
+    ).filter(user_shares.c.shared_with_id == current_user.id).all()
+    logger.debug("Retrieved %d users who have shared their calendars with %s.", len(users_who_shared), current_user.email)
     return users_who_shared
 
 @router.post("/share-with-me/{user_id}", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def share_calendar_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def share_calendar_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Allow another user to share their calendar with the current user."""
     user_to_share = db.query(User).filter(User.id == user_id).first()
     if not user_to_share:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    if current_user in user_to_share.shared_with:
-        logger.debug(f"{user_to_share.email} has already shared their calendar with {current_user.email}.")
-        return current_user
+        raise _user_not_found(user_id)
     
-    user_to_share.shared_with.append(current_user)
-    db.commit()
-    db.refresh(user_to_share)
-    logger.debug(f"{user_to_share.email} shared their calendar with {current_user.email}.")
+    share_calendar(db, user_to_share.id, current_user.id)
+    logger.debug("%s shared their calendar with %s.", user_to_share.email, current_user.email)
     return current_user
 
 @router.delete("/unshare-with-me/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def unshare_calendar_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def unshare_calendar_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Allow another user to stop sharing their calendar with the current user."""
-    user_to_unshare = db.query(User).filter(User.id == user_id).first()
-    if not user_to_unshare:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    if current_user not in user_to_unshare.shared_with:
-        logger.debug(f"{user_to_unshare.email} has not shared their calendar with {current_user.email}.")
+    if not unshare_calendar(db, user_id, current_user.id):
+        if not db.query(exists().where(User.id == user_id)).scalar():
+            raise _user_not_found(user_id)
+        logger.debug("User %s has not shared their calendar with %s.", user_id, current_user.email)
         return
     
-    user_to_unshare.shared_with.remove(current_user)
-    db.commit()
-    logger.debug(f"{user_to_unshare.email} unshared their calendar with {current_user.email}.")
+    logger.debug("User %s unshared their calendar with %s.", user_id, current_user.email)
     
     return {"detail": "Calendar unshared successfully"}
 
 @router.get("/shared-with-me/{user_id}", response_model=UserResponse)
-def get_shared_calendar_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def get_shared_calendar_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get a specific user's calendar that has been shared with the current user."""
     user_to_check = db.query(User).filter(User.id == user_id).first()
     if not user_to_check:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        raise _user_not_found(user_id)
     
-    if current_user not in user_to_check.shared_with:
-        logger.debug(f"{user_to_check.email} has not shared their calendar with {current_user.email}.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar not shared with you")
+    if not is_calendar_shared(db, user_to_check.id, current_user.id):
+        logger.debug("%s has not shared their calendar with %s.", user_to_check.email, current_user.email)
+        raise _calendar_not_shared(status.HTTP_404_NOT_FOUND)
     
-    logger.debug(f"Retrieved shared calendar for {user_to_check.email} for {current_user.email}.")
+    logger.debug("Retrieved shared calendar for %s for %s.", user_to_check.email, current_user.email)
     return user_to_check
 
 @router.get("/shared-with-me/{user_id}/events", response_model=list[EventResponse])
-def get_shared_events_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def get_shared_events_with_me(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get events from a specific user's calendar that has been shared with the current user."""
     user_to_check = db.query(User).filter(User.id == user_id).first()
     if not user_to_check:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        raise _user_not_found(user_id)
     
-    if current_user not in user_to_check.shared_with:
-        logger.debug(f"{user_to_check.email} has not shared their calendar with {current_user.email}.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar not shared with you")
+    if not is_calendar_shared(db, user_to_check.id, current_user.id):
+        logger.debug("%s has not shared their calendar with %s.", user_to_check.email, current_user.email)
+        raise _calendar_not_shared(status.HTTP_404_NOT_FOUND)
     
     events = db.query(Event).filter(Event.owner_id == user_to_check.id).all()
-    if not events:
-        logger.warning(f"No events found in {user_to_check.email}'s calendar shared with {current_user.email}.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No events found")
-    
-    logger.debug(f"Retrieved {len(events)} events from {user_to_check.email}'s calendar shared with {current_user.email}.")
+    logger.debug("Retrieved %d events from %s's calendar shared with %s.", len(events), user_to_check.email, current_user.email)
     return events
 
 @router.post("/share-with-me/{user_id}/events", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
-def share_event_with_me(event_data: EventCreate, user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def share_event_with_me(event_data: EventCreate, user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Allow another user to share a specific event with the current user."""
     user_to_share = db.query(User).filter(User.id == user_id).first()
     if not user_to_share:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        raise _user_not_found(user_id)
     
-    if current_user in user_to_share.shared_with:
+    if is_calendar_shared(db, user_to_share.id, current_user.id):
         # Create new event for the current user using the EventCreate data
         new_event = Event(
             title=event_data.title,
@@ -168,32 +180,30 @@ def share_event_with_me(event_data: EventCreate, user_id: int, current_user: Use
         )
         db.add(new_event)
         db.commit()
-        db.refresh(new_event)
-        logger.debug(f"{user_to_share.email} shared an event with {current_user.email}.")
+        logger.debug("%s shared an event with %s.", user_to_share.email, current_user.email)
         return new_event
     
-    logger.debug(f"{user_to_share.email} has not shared their calendar with {current_user.email}.")
-    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Calendar not shared with you")
+    logger.debug("%s has not shared their calendar with %s.", user_to_share.email, current_user.email)
+    raise _calendar_not_shared(status.HTTP_403_FORBIDDEN)
 
 @router.delete("/unshare-with-me/{user_id}/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-def unshare_event_with_me(event_id: int, user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_database_connection)):
+def unshare_event_with_me(event_id: int, user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Allow another user to stop sharing a specific event with the current user."""
     user_to_unshare = db.query(User).filter(User.id == user_id).first()
     if not user_to_unshare:
-        logger.warning(f"User with id {user_id} not found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        raise _user_not_found(user_id)
     
-    if current_user not in user_to_unshare.shared_with:
-        logger.debug(f"{user_to_unshare.email} has not shared their calendar with {current_user.email}.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar not shared with you")
+    if not is_calendar_shared(db, user_to_unshare.id, current_user.id):
+        logger.debug("%s has not shared their calendar with %s.", user_to_unshare.email, current_user.email)
+        raise _calendar_not_shared(status.HTTP_404_NOT_FOUND)
     
     event_to_unshare = db.query(Event).filter(Event.id == event_id, Event.owner_id == user_to_unshare.id).first()
     if not event_to_unshare:
-        logger.warning(f"Event with id {event_id} not found in {user_to_unshare.email}'s calendar.")
+        logger.warning("Event with id %s not found in %s's calendar.", event_id, user_to_unshare.email)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     
     db.delete(event_to_unshare)
     db.commit()
-    logger.debug(f"{user_to_unshare.email} unshared event {event_to_unshare.title} with {current_user.email}.")
+    logger.debug("%s unshared event %s with %s.", user_to_unshare.email, event_to_unshare.title, current_user.email)
     
     return {"detail": "Event unshared successfully"}
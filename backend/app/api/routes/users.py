@@ -1,33 +1,86 @@
 # GET api call for users
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session, raiseload
+from database import SessionLocal, get_db
 from app.models.user import User
+from app.config.settings import get_settings
+from app.core.cache import (
+    USERS_CACHE_KEY, cache_delete, cache_get_swr, cache_hget, cache_hset, cache_set_swr, user_cache_key
+)
 from app.core.logging import get_logger
-from schemas import UserResponse, UserOut
+from schemas import UserOut, UserPage, UserResponse
 
+settings = get_settings()
 logger = get_logger(__name__)
 router = APIRouter()
 
-@router.get("/", response_model=list[UserResponse])
-def get_users(db: Session = Depends(get_db)):
-    """Search users to share with"""
-    users = db.query(User).all()
-    if not users: # Checks if users list is empty
-        logger.warning("No users found.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No users found")
-    return users
+@router.get("/", response_class=Response, responses={200: {"model": UserPage}})
+def get_users(
+    cursor: int = Query(0, ge=0, description="Return users with an id greater than this"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Search users to share with, one page at a time"""
+    # The directory rarely changes, so serve the already-serialised page from Redis when we can
+    page_field = f"{cursor}:{limit}"
+    cached = cache_hget(USERS_CACHE_KEY, page_field)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Keyset pagination on the primary key, selecting only the columns UserResponse needs
+    users = db.query(User.id, User.username, User.email).filter(
+        User.id > cursor
+    ).order_by(User.id).limit(limit).all()
+
+    # Rows come straight from the users table, so build the models without re-validating them
+    page = UserPage.model_construct(
+        items=[UserResponse.model_construct(id=u.id, username=u.username, email=u.email) for u in users],
+        next_cursor=users[-1].id if len(users) == limit else None,
+    )
+    body = page.model_dump_json().encode("utf-8")
+    cache_hset(USERS_CACHE_KEY, page_field, body, settings.users_cache_ttl)
+    # Send the bytes we just cached rather than re-validating and re-encoding the page
+    return Response(content=body, media_type="application/json")
+
+def _cache_user(user: User) -> None:
+    """Serialise a user once and store it under user:{id}."""
+    cache_set_swr(
+        user_cache_key(user.id),
+        UserOut.model_validate(user).model_dump_json().encode("utf-8"),
+        settings.user_cache_ttl,
+        settings.user_cache_stale_ttl,
+    )
+
+def refresh_user(user_id: int) -> None:
+    """Background task: reload a stale user:{id} entry with its own session."""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user:
+            _cache_user(user)
+        else:
+            cache_delete(user_cache_key(user_id))
+    finally:
+        db.close()
 
 @router.get("/{user_id}", response_model=UserOut)
-def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
+def get_user_by_id(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Get a user by their ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    # Serve from cache, even slightly stale - a background task refreshes stale entries
+    cached, needs_refresh = cache_get_swr(user_cache_key(user_id))
+    if cached is not None:
+        if needs_refresh:
+            background_tasks.add_task(refresh_user, user_id)
+        return Response(content=cached, media_type="application/json")
+
+    user = db.query(User).options(raiseload('*')).filter(User.id == user_id).first()
     if not user:
-        logger.warning(f"User with id {user_id} not found.")
+        logger.warning("User with id %s not found.", user_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    logger.debug(f"Retrieved user with id {user_id}.")
+    _cache_user(user)
+    logger.debug("Retrieved user with id %s.", user_id)
     return user
 
 # The above endpoint accepts a user ID from the URL path, queries the database
@@ -7,6 +7,7 @@ from functools import lru_cache
 # Need this to know if I'm running locally vs on the server
 class Environment(str, Enum):
     DEVELOPMENT = "development"
+    TESTING = "testing"
     STAGING = "staging"
     PRODUCTION = "production"
 
@@ -28,11 +29,24 @@ class Settings(BaseSettings):
     
     # Database connection - PostgreSQL for real deployment, SQLite for local testing
     database_url: str  # type: ignore  # Loaded from .env automatically
+
+    # Connection pool - default QueuePool (5 + 10 overflow) runs dry under concurrent requests
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_statement_timeout_ms: int = 5000  # PostgreSQL only
+    # Log every SQL statement - handy when debugging queries, far too slow and noisy to leave on
+    db_echo: bool = False
     
     # JWT auth settings - needed for login/logout functionality
     secret_key: str  # type: ignore  # Loaded from .env automatically
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+
+    # bcrypt cost factor - every +1 doubles hashing CPU (12 is ~250ms per login/register).
+    # Keep 12+ in production; BCRYPT_ROUNDS=4 is plenty for tests and local seeding.
+    bcrypt_rounds: int = 12
     
     # Security stuff for the API - controls who can access from where
     allowed_hosts: list[str] = []
@@ -48,6 +62,12 @@ class Settings(BaseSettings):
     
     # External services I might need later - Redis for caching, email for notifications
     redis_url: str = "redis://localhost:6379/0"
+    cache_enabled: bool = True
+    cache_socket_timeout: float = 0.25  # seconds - a slow Redis shouldn't slow down requests
+    users_cache_ttl: int = 60  # seconds the GET /users list stays cached
+    user_cache_ttl: int = 60  # seconds a GET /users/{id} entry is fresh
+    user_cache_stale_ttl: int = 30  # extra seconds it may be served stale while refreshing
+    cache_refresh_lock_seconds: int = 10
     smtp_server: str = "smtp.example.com"
     smtp_port: int = 587
     
@@ -59,7 +79,6 @@ class Settings(BaseSettings):
             raise ValueError('Secret key cannot be empty')
         
         # Relax validation for development
-        import os
         env = os.getenv('ENVIRONMENT', 'development')
         
         if env == 'production' and len(v) < 32:
@@ -86,4 +105,7 @@ class Settings(BaseSettings):
 
 @lru_cache()
 def get_settings():
-    return Settings()
\ No newline at end of file
+    return Settings()
+
+# Build and validate settings once at import, so no request pays for the .env parsing
+settings = get_settings()
\ No newline at end of file
@@ -0,0 +1,143 @@
+import time
+from collections import Counter
+from threading import Lock
+from typing import Optional, Tuple
+
+import redis
+
+from app.config.settings import get_settings
+from app.core.logging import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Cache keys
+USERS_CACHE_KEY = "users:all"  # hash of serialised GET /users pages, one field per page
+
+def user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+# Hit/miss/error counters, readable via cache_stats()
+_stats: Counter = Counter()
+_stats_lock = Lock()
+
+_client: Optional[redis.Redis] = None
+# Redis is optional - after a failure, skip it for a while instead of paying a
+# connection timeout on every request
+_RETRY_AFTER_SECONDS = 30
+_unavailable_until = 0.0
+
+def _record(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+def _mark_unavailable(error: Exception) -> None:
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + _RETRY_AFTER_SECONDS
+    _record("errors")
+    logger.warning("Redis unavailable, bypassing cache for %ss: %s", _RETRY_AFTER_SECONDS, error)
+
+def get_redis() -> Optional[redis.Redis]:
+    """Get the shared Redis client, or None if caching is disabled or Redis is down."""
+    global _client
+    if not settings.cache_enabled or time.monotonic() < _unavailable_until:
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=settings.cache_socket_timeout,
+            socket_connect_timeout=settings.cache_socket_timeout,
+        )
+    return _client
+
+def close_redis() -> None:
+    """Close the Redis connection pool (called on shutdown)."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+def cache_hget(key: str, field: str) -> Optional[bytes]:
+    """Return the cached bytes for field in hash key, or None on a miss or Redis error."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        value = client.hget(key, field)
+    except redis.RedisError as e:
+        _mark_unavailable(e)
+        return None
+    _record("hits" if value is not None else "misses")
+    return value
+
+def cache_hset(key: str, field: str, value: bytes, ttl: int) -> None:
+    """
+    Store value as field in hash key. The whole hash expires ttl seconds after its
+    first field was written, so one DEL (or the TTL) drops every field together.
+    Failures are logged and ignored.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, field, value)
+        pipe.expire(key, ttl, nx=True)
+        pipe.execute()
+    except redis.RedisError as e:
+        _mark_unavailable(e)
+
+def cache_delete(*keys: str) -> None:
+    """Invalidate cached keys. Failures are logged and ignored."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(*keys)
+    except redis.RedisError as e:
+        _mark_unavailable(e)
+
+def cache_get_swr(key: str) -> Tuple[Optional[bytes], bool]:
+    """
+    Stale-while-revalidate read. Returns (body, needs_refresh).
+
+    body is None on a miss. needs_refresh is True only when the entry is past its
+    fresh window and this caller won the refresh lock, so a burst of requests for
+    a stale key schedules a single refresh.
+    """
+    client = get_redis()
+    if client is None:
+        return None, False
+    try:
+        entry = client.hgetall(key)
+        if not entry:
+            _record("misses")
+            return None, False
+        _record("hits")
+        if time.time() < float(entry[b"fresh_until"]):
+            return entry[b"body"], False
+        needs_refresh = bool(client.set(f"{key}:refreshing", 1, nx=True, ex=settings.cache_refresh_lock_seconds))
+        return entry[b"body"], needs_refresh
+    except redis.RedisError as e:
+        _mark_unavailable(e)
+        return None, False
+
+def cache_set_swr(key: str, value: bytes, ttl: int, stale_ttl: int) -> None:
+    """Store value as fresh for ttl seconds, then servable-but-stale for stale_ttl more."""
+    client = get_redis()
+    if client is None:
+        return
+    now = time.time()
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping={"body": value, "fresh_until": now + ttl})
+        pipe.expire(key, ttl + stale_ttl)
+        pipe.delete(f"{key}:refreshing")
+        pipe.execute()
+    except redis.RedisError as e:
+        _mark_unavailable(e)
+
+def cache_stats() -> dict[str, int]:
+    """Snapshot of cache hit/miss/error counts for this process."""
+    with _stats_lock:
+        return {outcome: _stats[outcome] for outcome in ("hits", "misses", "errors")}
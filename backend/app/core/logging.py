@@ -1,18 +1,35 @@
 import logging
 import logging.config
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, Optional, List
-import json
-import uuid
 from contextvars import ContextVar
 
-from app.config.settings import get_settings
+import orjson
+
+from app.config.settings import settings
 from logging.handlers import RotatingFileHandler
 
 # Context variable for request correlation ID
 correlation_id: ContextVar[str] = ContextVar('correlation_id', default="")
 
+# Standard LogRecord attributes - anything else on a record came from `extra=` and gets logged.
+# Built once here rather than on every format() call.
+_STD_LOGRECORD_ATTRS = frozenset({
+    'name', 'msg', 'args', 'levelname', 'levelno', 'pathname',
+    'filename', 'module', 'exc_info', 'exc_text', 'stack_info',
+    'lineno', 'funcName', 'created', 'msecs', 'relativeCreated',
+    'thread', 'threadName', 'processName', 'process', 'getMessage',
+    'taskName', 'message', 'asctime', 'correlation_id'
+})
+
+# Bound once so JSONFormatter.format doesn't repeat the global + attribute lookups per record
+_dumps = orjson.dumps
+_DUMPS_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+_fromtimestamp = datetime.fromtimestamp
+_UTC = timezone.utc
+
 class CorrelationFilter(logging.Filter):
     """Add correlation ID to log records."""
     
@@ -25,7 +42,8 @@ class JSONFormatter(logging.Formatter):
     
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            # Time the record was created, not formatted; orjson renders it with a trailing "Z"
+            "timestamp": _fromtimestamp(record.created, _UTC),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -35,7 +53,7 @@ class JSONFormatter(logging.Formatter):
         }
         
         # Add correlation ID if present
-        correlation_id_value = getattr(record, 'correlation_id', '')
+        correlation_id_value = record.__dict__.get('correlation_id')
         if correlation_id_value:
             log_entry["correlation_id"] = correlation_id_value
         
@@ -43,23 +61,16 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
             
-        # Add extra fields
-        for key, value in record.__dict__.items():
-            if key not in {
-                'name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 
-                'filename', 'module', 'exc_info', 'exc_text', 'stack_info',
-                'lineno', 'funcName', 'created', 'msecs', 'relativeCreated',
-                'thread', 'threadName', 'processName', 'process', 'getMessage',
-                'correlation_id'
-            }:
-                log_entry[key] = value
+        # Add extra fields - a set difference against the frozenset instead of a
+        # membership test per attribute, most records carry no extras at all
+        record_dict = record.__dict__
+        for key in record_dict.keys() - _STD_LOGRECORD_ATTRS:
+            log_entry[key] = record_dict[key]
                 
-        return json.dumps(log_entry, default=str)
+        return _dumps(log_entry, default=str, option=_DUMPS_OPTIONS).decode("utf-8")
 
 def setup_logging() -> None:
     """Configure logging based on environment settings."""
-    settings = get_settings()
-    
     # Choose formatter based on environment
     if settings.environment.value == "production":
         json_formatter = JSONFormatter()
@@ -80,8 +91,8 @@ def setup_logging() -> None:
     # Start with console handler
     handlers: List[logging.Handler] = [console_handler]
     
-    # Add file handler for non-development environments
-    if settings.environment.value != "development":
+    # Add file handler for deployed environments
+    if settings.environment.value in ("staging", "production"):
         file_handler = RotatingFileHandler(
             settings.log_file,
             maxBytes=settings.log_max_size,
@@ -101,7 +112,8 @@ def setup_logging() -> None:
     # Configure specific loggers
     loggers = {
         "uvicorn.access": logging.WARNING,
-        "sqlalchemy.engine": logging.WARNING if settings.environment.value == "production" else logging.INFO,
+        # SQLAlchemy logs statements whenever this logger allows INFO, regardless of echo
+        "sqlalchemy.engine": logging.INFO if settings.db_echo else logging.WARNING,
         "alembic": logging.INFO,
         "app": getattr(logging, settings.log_level.upper()),
     }
@@ -109,14 +121,13 @@ def setup_logging() -> None:
     for logger_name, level in loggers.items():
         logging.getLogger(logger_name).setLevel(level)
 
+@lru_cache(maxsize=256)
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with the specified name."""
     return logging.getLogger(name)
 
-def set_correlation_id(request_id: Optional[str] = None) -> str:
-    """Set correlation ID for request tracing."""
-    if request_id is None:
-        request_id = str(uuid.uuid4())[:8]
+def set_correlation_id(request_id: str) -> str:
+    """Set correlation ID for request tracing. Callers generate the ID (see LoggingMiddleware)."""
     correlation_id.set(request_id)
     return request_id
 
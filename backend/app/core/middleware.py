@@ -1,60 +1,60 @@
+import logging
+import os
 import time
-import uuid
 from typing import Callable
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.core.logging import get_logger, set_correlation_id
+from app.core.logging import correlation_id as correlation_id_var, get_logger
 
 logger = get_logger(__name__)
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Middleware to log requests and responses."""
+
+    # Health checks and API docs are polled constantly - don't log them or tag them with an ID
+    SKIP_PATHS = frozenset({"/health", "/openapi.json", "/docs", "/redoc"})
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        if request.url.path in self.SKIP_PATHS:
+            return await call_next(request)
+
         # Generate correlation ID for this request
-        correlation_id = str(uuid.uuid4())[:8]
-        set_correlation_id(correlation_id)
+        correlation_id = os.urandom(4).hex()
+        correlation_id_var.set(correlation_id)
         
-        # Log request start
-        start_time = time.time()
-        logger.info(
-            "Request started",
-            extra={
-                "method": request.method,
-                "url": str(request.url),
-                "client_ip": request.client.host if request.client else None,
-                "user_agent": request.headers.get("user-agent"),
-            }
-        )
+        start_time = time.perf_counter()
         
         # Process request
         try:
             response = await call_next(request)
         except Exception as e:
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             logger.error(
                 "Request failed",
                 extra={
                     "method": request.method,
                     "url": str(request.url),
-                    "process_time": round(process_time, 4),
+                    "process_time_us": int(process_time * 1_000_000),
                     "error": str(e),
                 }
             )
             raise
         
-        # Log request completion
-        process_time = time.time() - start_time
-        logger.info(
-            "Request completed",
-            extra={
-                "method": request.method,
-                "url": str(request.url),
-                "status_code": response.status_code,
-                "process_time": round(process_time, 4),
-            }
-        )
+        # One access-log line per request, built only if INFO is actually enabled
+        if logger.isEnabledFor(logging.INFO):
+            process_time = time.perf_counter() - start_time
+            logger.info(
+                "Request completed",
+                extra={
+                    "method": request.method,
+                    "url": str(request.url),
+                    "status_code": response.status_code,
+                    "process_time_us": int(process_time * 1_000_000),
+                    "client_ip": request.client.host if request.client else None,
+                    "user_agent": request.headers.get("user-agent"),
+                }
+            )
         
         # Add correlation ID to response headers
         response.headers["X-Correlation-ID"] = correlation_id
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime,ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime,ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.models.base import Base # Import Base from the database module
 
 class Event(Base):
     __tablename__ = 'events'
+    # Every event query is scoped to one owner, and calendar ranges add start_time on top.
+    # The leading owner_id column also serves plain owner lookups and the FK cascade.
+    __table_args__ = (
+        Index('ix_events_owner_start', 'owner_id', 'start_time'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), index=True)
@@ -13,11 +18,10 @@ class Event(Base):
     location = Column(String(200), nullable=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    
-    owner = relationship("User", back_populates="events")
+    # EventResponse only needs owner_id, so never load the owner implicitly
+    owner = relationship("User", back_populates="events", lazy="raise_on_sql")
     
     def __repr__(self):
         return f"<Event(id={self.id}, title={self.title}, start_time={self.start_time}, end_time={self.end_time})>"
@@ -1,12 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, Table, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, DateTime, func, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base # Import Base from the database module
 
 user_shares = Table(
     'user_shares', Base.metadata,
     Column('sharer_id', Integer, ForeignKey('users.id'), primary_key=True),
-    Column('shared_with_id', Integer, ForeignKey('users.id'), primary_key=True), extend_existing=True 
+    Column('shared_with_id', Integer, ForeignKey('users.id'), primary_key=True),
+    # The (sharer_id, shared_with_id) primary key covers "who did I share with";
+    # this covers the reverse "who shared with me" lookups
+    Index('ix_user_shares_shared_with_id', 'shared_with_id'),
+    extend_existing=True
 )
 
 class User(Base):
@@ -20,7 +23,16 @@ class User(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
-    events = relationship("Event", back_populates="owner", cascade="all, delete-orphan")
+    # Relationships never load implicitly - routes query events and user_shares directly,
+    # so any accidental attribute access raises instead of issuing a hidden SELECT per object.
+    # The events FK has no ON DELETE CASCADE, so delete_user bulk-deletes events itself;
+    # the ORM cascade below only covers a plain session.delete(user)
+    events = relationship(
+        "Event",
+        back_populates="owner",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql"
+    )
     
     # For calendar sharing
     shared_with = relationship(
@@ -28,7 +40,8 @@ class User(Base):
         secondary=user_shares,
         primaryjoin=id == user_shares.c.sharer_id,
         secondaryjoin=id == user_shares.c.shared_with_id,
-        back_populates="shared_by"
+        back_populates="shared_by",
+        lazy="raise_on_sql"
     )
     
     shared_by = relationship(
@@ -36,7 +49,8 @@ class User(Base):
         secondary=user_shares,
         primaryjoin=id == user_shares.c.shared_with_id,
         secondaryjoin=id == user_shares.c.sharer_id,
-        back_populates="shared_with"
+        back_populates="shared_with",
+        lazy="raise_on_sql"
     )
 
     def __repr__(self):
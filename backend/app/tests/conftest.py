@@ -0,0 +1,39 @@
+import functools
+
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+
+from app.api.routes import auth_routes
+from database import get_db
+
+@pytest.fixture(scope="session", autouse=True)
+def _cache_bcrypt():
+    """
+    Memoise the real bcrypt helpers for the whole test session. A test that reaches them
+    unpatched pays for each distinct (password, hash) once instead of ~250ms per call.
+    Tests that patch these names themselves still see their own mocks.
+    """
+    with patch.object(auth_routes, 'get_password_hash', functools.lru_cache(maxsize=None)(auth_routes.get_password_hash)), \
+         patch.object(auth_routes, 'verify_password', functools.lru_cache(maxsize=None)(auth_routes.verify_password)):
+        yield
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    One TestClient for the whole session, so the app is wired and its startup runs once.
+    get_db is overridden with a throwaway mock - use client_db to control it per test.
+    """
+    from main import app
+    app.dependency_overrides[get_db] = MagicMock
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def client_db(client) -> MagicMock:
+    """Mock session handed to every request this test makes through client."""
+    db = MagicMock()
+    client.app.dependency_overrides[get_db] = lambda: db
+    yield db
+    client.app.dependency_overrides[get_db] = MagicMock
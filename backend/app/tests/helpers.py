@@ -0,0 +1,27 @@
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+def assert_http_error(call: Callable[[], Any], status_code: int, detail: str, headers: Optional[dict] = None) -> None:
+    """Assert that call() raises an HTTPException with this status code, detail and (optionally) headers."""
+    try:
+        call()
+    except HTTPException as e:
+        assert e.status_code == status_code
+        assert str(e.detail) == detail
+        if headers is not None:
+            assert e.headers == headers
+        return
+    raise AssertionError("HTTPException not raised")
+
+def assert_query_chain(db: Any, model: Any, *chain: str) -> None:
+    """
+    Assert db.query(model) ran once, then each named step after it, in order, ran once.
+    e.g. assert_query_chain(mock_db, Event, "filter", "all") for db.query(Event).filter(...).all()
+    """
+    db.query.assert_called_once_with(model)
+    step = db.query.return_value
+    for name in chain:
+        method = getattr(step, name)
+        method.assert_called_once()
+        step = method.return_value
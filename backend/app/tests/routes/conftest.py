@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import MagicMock
+
+class _SharedSessionMock(MagicMock):
+    """
+    MagicMock that refuses attribute rebinding (mock_db.commit = ...), which reset_mock cannot undo.
+    Everything under a return_value is rebuilt by the reset, so those children are plain MagicMocks.
+    """
+
+    def __setattr__(self, name, value):
+        if not name.startswith("_") and not hasattr(type(self), name) and name not in self.__dict__:
+            raise AttributeError(
+                f"mock_db is shared between tests - configure {name}.return_value/side_effect "
+                f"instead of rebinding {name}"
+            )
+        super().__setattr__(name, value)
+
+    def _get_child_mock(self, **kw):
+        if kw.get("_new_name") == "()":
+            return MagicMock(**kw)
+        return _SharedSessionMock(**kw)
+
+@pytest.fixture(scope="session")
+def _session_mock_db() -> MagicMock:
+    """One MagicMock per worker, recycled by mock_db instead of built for every test."""
+    return _SharedSessionMock()
+
+@pytest.fixture
+def mock_db(_session_mock_db) -> MagicMock:
+    """
+    Mock database session, reset after every test (calls, return values and side effects).
+    Configure it through return_value/side_effect - rebinding an attribute raises, since the
+    replacement would survive the reset and leak into the next test.
+    """
+    yield _session_mock_db
+    _session_mock_db.reset_mock(return_value=True, side_effect=True)
+
+@pytest.fixture
+def query_first(mock_db) -> MagicMock:
+    """The .first() at the end of db.query(...).filter(...).first() - set its return_value/side_effect."""
+    return mock_db.query.return_value.filter.return_value.first
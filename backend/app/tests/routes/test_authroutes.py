@@ -4,7 +4,7 @@
 # 1. Mocking with unittest.mock (MagicMock, patch decorators)
 # 2. Testing FastAPI route functions directly
 # 3. Database session mocking for SQLAlchemy
-# 4. Exception testing with pytest.raises
+# 4. Exception testing with assert_http_error (app/tests/helpers.py)
 # 5. Side effects for simulating different database states
 # 6. Proper bcrypt hash mocking to avoid cryptographic errors
 # 7. Patch targeting (patching where functions are used, not defined)
@@ -23,48 +23,49 @@
 # - Sequential query simulation with side_effect
 # - Proper type annotations for optional parameters
 # - Security testing with bcrypt hash formats
-# - Exception assertion with pytest.raises
+# - Exception assertion with assert_http_error
 # - Mock verification with assert_called_once_with
 
+import asyncio
 import pytest
-import sys
-import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, MagicMock, NonCallableMagicMock, patch
 from typing import Any, Optional
 
-# Add the backend directory to Python path if needed
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from fastapi import HTTPException, status
+from fastapi import status
+from app.api.routes import auth_routes
 from app.api.routes.auth_routes import register_user, login_user, get_current_user_info, update_user_info, delete_user
 from app.models.user import User
+from app.tests.helpers import assert_http_error
+
+# Properly formatted bcrypt hash of "password", shared by mock_user() and the assertions that check it
+_BCRYPT_HASH = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBdkxuivzBmcHW"
 
-@pytest.fixture
-def mock_db():
+@pytest.fixture(autouse=True)
+def no_cache():
     """
-    PYTEST FIXTURE CONCEPT: Creates a reusable mock database session.
-    Fixtures provide consistent test data/objects across multiple tests.
-    The 'mock_db' parameter in test functions automatically receives this object.
+    AUTOUSE FIXTURE: Runs for every test without being requested.
+    Write routes invalidate the Redis users cache - patch it out so tests never touch Redis.
     """
-    db = MagicMock()
-    return db
+    with patch.object(auth_routes, 'cache_delete') as mock_cache_delete:
+        yield mock_cache_delete
 
 def mock_user(user_id: int = 1, username: str = "testuser", email: str = "test@example.com", name: str = "Test User"):
     """
-    MOCK OBJECT CREATION: Creates a mock User object with spec=User.
-    Using spec ensures the mock has the same interface as the real User model.
+    MOCK OBJECT CREATION: Creates a mock User object with spec_set=User.
+    spec_set ensures the mock has the same interface as the real User model - reading OR
+    setting an attribute User doesn't have raises AttributeError.
     
     BCRYPT HASH FORMAT: Uses proper bcrypt format ($2b$12$...) instead of plain text.
-    This prevents 'passlib.exc.UnknownHashError' when password verification is tested.
+    This keeps the fixture realistic if password verification is ever exercised unmocked.
     Real bcrypt hashes have: $algorithm$cost$salt+hash
     """
-    user = MagicMock(spec=User)
+    user = NonCallableMagicMock(spec_set=User)
     user.id = user_id
     user.username = username
     user.email = email
     user.name = name
-    # CRITICAL: Use properly formatted bcrypt hash to avoid passlib errors
-    user.hashed_password = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBdkxuivzBmcHW"  # "password"
+    # CRITICAL: Use properly formatted bcrypt hash so bcrypt.checkpw can parse it
+    user.hashed_password = _BCRYPT_HASH
     return user
 
 def mock_user_create_data(username: str = "newuser", email: str = "new@example.com", password: str = "password123"):
@@ -104,13 +105,11 @@ def mock_user_update_data(username: Optional[str] = None, email: Optional[str] =
 # REGISTRATION TESTS
 # ================================
 
-@patch('app.api.routes.auth_routes.get_password_hash')  # Patch where it's used
-@patch('app.api.routes.auth_routes.User')  # Patch where it's used
-def test_register_user_success(mock_user_class, mock_hash, mock_db) -> None:
+def test_register_user_success(mock_db, query_first) -> None:
     """
     COMPREHENSIVE REGISTRATION TEST:
     - Tests successful user creation flow
-    - Validates database operations (add, commit, refresh)
+    - Validates database operations (add, commit; no refresh round-trip)
     - Ensures password hashing is called correctly
     - Verifies no existing user conflicts
     
@@ -118,22 +117,22 @@ def test_register_user_success(mock_user_class, mock_hash, mock_db) -> None:
     When auth_routes.py imports: "from app.utils.auth import get_password_hash"
     You must patch the reference in auth_routes, not the original in utils.auth
     
-    MOCK CHAINING: mock_db.query.return_value.filter.return_value.first.return_value
-    This simulates: db.query(User).filter(User.email == email).first()
+    MOCK CHAINING: query_first (from conftest.py) is mock_db.query.return_value.filter.return_value.first
+    Setting query_first.return_value simulates: db.query(User).filter(User.email == email).first()
     """
     user_data = mock_user_create_data()
     new_user = mock_user(1, "newuser", "new@example.com")
     
-    mock_user_class.return_value = new_user
-    mock_hash.return_value = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBdkxuivzBmcHW"
-    
     # DATABASE MOCK SETUP: Simulates queries returning None (no existing users)
-    mock_db.query.return_value.filter.return_value.first.return_value = None
-    mock_db.add = MagicMock()
-    mock_db.commit = MagicMock()
-    mock_db.refresh = MagicMock()
+    query_first.return_value = None
+
+    # Patch where it's used - both names in one patch.multiple context
+    with patch.multiple(auth_routes, get_password_hash=DEFAULT, User=DEFAULT) as mocks:
+        mock_hash = mocks["get_password_hash"]
+        mocks["User"].return_value = new_user
+        mock_hash.return_value = _BCRYPT_HASH
 
-    result: Any = register_user(user_data=user_data, db=mock_db)
+        result: Any = register_user(user_data=user_data, db=mock_db)
 
     # ASSERTIONS: Verify expected behavior
     assert result.username == "newuser"
@@ -143,79 +142,70 @@ def test_register_user_success(mock_user_class, mock_hash, mock_db) -> None:
     mock_hash.assert_called_once_with("password123")
     mock_db.add.assert_called_once_with(new_user)
     mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(new_user)
+    mock_db.refresh.assert_not_called()
 
-def test_register_user_email_exists(mock_db) -> None:
+def test_register_user_email_exists(mock_db, query_first) -> None:
     """
     CONFLICT TESTING: Tests duplicate email validation.
     
-    SIDE_EFFECT CONCEPT: side_effect allows different return values for multiple calls.
-    [existing_user, None] means:
-    - First query (email check) returns existing_user 
-    - Second query (username check) returns None
-    This simulates finding an email conflict but no username conflict.
+    SINGLE QUERY CONCEPT: Email and username are checked with one OR query.
+    The route inspects the returned row to decide which field clashed,
+    so the existing user here shares the email but not the username.
     """
     user_data = mock_user_create_data()
-    existing_user = mock_user()
+    existing_user = mock_user(2, "someoneelse", "new@example.com")
     
-    mock_db.query.return_value.filter.return_value.first.side_effect = [existing_user, None]
+    query_first.return_value = existing_user
     
-    # EXCEPTION TESTING: pytest.raises captures and validates HTTPException
-    with pytest.raises(HTTPException) as exc_info:
-        register_user(user_data=user_data, db=mock_db)
-    
-    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
-    assert str(exc_info.value.detail) == "Email already registered"
+    # EXCEPTION TESTING: assert_http_error runs the call and validates the HTTPException it raises
+    assert_http_error(lambda: register_user(user_data=user_data, db=mock_db), status.HTTP_400_BAD_REQUEST, "Email already registered")
 
-def test_register_user_username_exists(mock_db) -> None:
-    """Tests duplicate username validation using side_effect pattern."""
+def test_register_user_username_exists(mock_db, query_first) -> None:
+    """Tests duplicate username validation - the clashing row has a different email."""
     user_data = mock_user_create_data()
-    existing_user = mock_user()
-    
-    # [None, existing_user] = no email conflict, username conflict  
-    mock_db.query.return_value.filter.return_value.first.side_effect = [None, existing_user]
+    existing_user = mock_user(2, "newuser", "other@example.com")
     
-    with pytest.raises(HTTPException) as exc_info:
-        register_user(user_data=user_data, db=mock_db)
+    query_first.return_value = existing_user
     
-    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
-    assert str(exc_info.value.detail) == "Username already taken"
+    assert_http_error(lambda: register_user(user_data=user_data, db=mock_db), status.HTTP_400_BAD_REQUEST, "Username already taken")
 
 # ================================
 # LOGIN/AUTHENTICATION TESTS
 # ================================
 
-@patch('app.api.routes.auth_routes.create_access_token')  # Patch where it's used
-@patch('app.api.routes.auth_routes.verify_password')  # Patch where it's used
-def test_login_user_success(mock_verify, mock_create_token, mock_db) -> None:
+def test_login_user_success(mock_db, query_first) -> None:
     """
     AUTHENTICATION FLOW TESTING:
     - Mocks password verification (bcrypt comparison)
     - Mocks JWT token generation
     - Tests successful login response format
     
-    DECORATOR ORDER: @patch decorators are applied bottom-up:
-    - mock_verify corresponds to verify_password (second decorator)  
-    - mock_create_token corresponds to create_access_token (first decorator)
+    PATCH.MULTIPLE: Installs both patches in one context instead of stacking decorators.
+    With DEFAULT it creates a MagicMock per name and hands them back in a dict keyed by name,
+    so there is no bottom-up decorator order to keep track of.
     """
     user_data = mock_user_login_data()
     db_user = mock_user()
     
-    mock_db.query.return_value.filter.return_value.first.return_value = db_user
-    mock_verify.return_value = True
-    mock_create_token.return_value = "fake_jwt_token_123"
+    query_first.return_value = db_user
     
-    result: Any = login_user(user_data=user_data, db=mock_db)
+    with patch.multiple(auth_routes, verify_password=DEFAULT, create_access_token=DEFAULT) as mocks:
+        mock_verify = mocks["verify_password"]
+        mock_create_token = mocks["create_access_token"]
+        mock_verify.return_value = True
+        mock_create_token.return_value = "fake_jwt_token_123"
+        
+        result: Any = login_user(user_data=user_data, db=mock_db)
     
     # JWT TOKEN RESPONSE FORMAT: Standard OAuth2 bearer token format
     assert result["access_token"] == "fake_jwt_token_123"
     assert result["token_type"] == "bearer"
     
     # VERIFY PARAMETERS: Ensure password verification called with correct values
-    mock_verify.assert_called_once_with("password123", "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBdkxuivzBmcHW")
+    mock_verify.assert_called_once_with("password123", _BCRYPT_HASH)
     mock_create_token.assert_called_once()
 
-def test_login_user_not_found(mock_db) -> None:
+def test_login_user_not_found(mock_db, query_first) -> None:
     """
     AUTHENTICATION ERROR TESTING: Tests user not found scenario.
     
@@ -227,29 +217,20 @@ def test_login_user_not_found(mock_db) -> None:
     """
     user_data = mock_user_login_data("nonexistent@example.com")
     
-    mock_db.query.return_value.filter.return_value.first.return_value = None
-    
-    with pytest.raises(HTTPException) as exc_info:
-        login_user(user_data=user_data, db=mock_db)
+    query_first.return_value = None
     
-    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
-    assert str(exc_info.value.detail) == "Invalid credentials"
-    assert exc_info.value.headers == {"WWW-Authenticate": "Bearer"}
+    assert_http_error(lambda: login_user(user_data=user_data, db=mock_db), status.HTTP_401_UNAUTHORIZED, "Invalid credentials", {"WWW-Authenticate": "Bearer"})
 
-@patch('app.api.routes.auth_routes.verify_password')  # Patch where it's used
-def test_login_user_wrong_password(mock_verify, mock_db) -> None:
+@patch.object(auth_routes, 'verify_password')  # Patch where it's used
+def test_login_user_wrong_password(mock_verify, mock_db, query_first) -> None:
     """Tests password verification failure - user exists but password is wrong."""
     user_data = mock_user_login_data()
     db_user = mock_user()
     
-    mock_db.query.return_value.filter.return_value.first.return_value = db_user
+    query_first.return_value = db_user
     mock_verify.return_value = False  # Password verification fails
     
-    with pytest.raises(HTTPException) as exc_info:
-        login_user(user_data=user_data, db=mock_db)
-    
-    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
-    assert str(exc_info.value.detail) == "Invalid credentials"
+    assert_http_error(lambda: login_user(user_data=user_data, db=mock_db), status.HTTP_401_UNAUTHORIZED, "Invalid credentials")
 
 # ================================
 # USER INFO RETRIEVAL TESTS
@@ -260,10 +241,13 @@ def test_get_current_user_info_success() -> None:
     SIMPLE PASS-THROUGH TESTING: Tests endpoint that just returns current user.
     No database operations or external dependencies to mock.
     This tests the FastAPI dependency injection system indirectly.
+    
+    ASYNC HANDLER: get_current_user_info is async def, so the call returns a coroutine.
+    asyncio.run drives it to completion without needing an async test plugin.
     """
     current_user = mock_user()
     
-    result: Any = get_current_user_info(current_user=current_user)
+    result: Any = asyncio.run(get_current_user_info(current_user=current_user))
     
     assert result.username == "testuser"
     assert result.email == "test@example.com"
@@ -273,33 +257,31 @@ def test_get_current_user_info_success() -> None:
 # USER UPDATE TESTS
 # ================================
 
-@patch('app.api.routes.auth_routes.get_password_hash')  # Patch where it's used
-def test_update_user_info_username_success(mock_hash, mock_db) -> None:
+@patch.object(auth_routes, 'get_password_hash')  # Patch where it's used
+def test_update_user_info_username_success(mock_hash, mock_db, query_first) -> None:
     """
     PARTIAL UPDATE TESTING: Tests PATCH-style updates where only some fields change.
     
-    SIDE_EFFECT FOR SEQUENTIAL QUERIES:
-    1. First query: Check username conflicts (returns None - no conflict)
-    2. Second query: Fetch updated user after database update
+    IN-PLACE UPDATES:
+    1. Only query: Check username/email conflicts (returns None - no conflict)
+    2. Fields are set on current_user itself, so no re-select after the update
     """
     current_user = mock_user()
     user_data = mock_user_update_data(username="newusername")
-    updated_user = mock_user(1, "newusername", "test@example.com")
     
-    # Mock the conflict check queries to return None (no conflicts)
-    mock_db.query.return_value.filter.return_value.first.side_effect = [None, updated_user]
-    mock_db.query.return_value.filter.return_value.update = MagicMock()
-    mock_db.commit = MagicMock()
+    # Mock the conflict check query to return None (no conflicts)
+    query_first.return_value = None
     
     result: Any = update_user_info(user_data=user_data, current_user=current_user, db=mock_db)
     
+    # ATTRIBUTE VERIFICATION: The session tracks these changes and flushes the UPDATE
+    assert result is current_user
     assert result.username == "newusername"
-    
-    # DICTIONARY UPDATE VERIFICATION: Ensure correct SQL UPDATE parameters
-    expected_update_data = {'username': 'newusername', 'name': 'newusername'}
-    mock_db.query.return_value.filter.return_value.update.assert_called_once_with(expected_update_data)
+    assert result.name == "newusername"
+    mock_db.query.assert_called_once()
+    mock_db.commit.assert_called_once()
 
-def test_update_user_info_username_conflict(mock_db) -> None:
+def test_update_user_info_username_conflict(mock_db, query_first) -> None:
     """
     CONFLICT DETECTION TESTING: Tests username uniqueness validation.
     return_value (not side_effect) because we expect immediate conflict on first query.
@@ -308,29 +290,21 @@ def test_update_user_info_username_conflict(mock_db) -> None:
     user_data = mock_user_update_data(username="existinguser")
     conflicting_user = mock_user(2, "existinguser")
     
-    mock_db.query.return_value.filter.return_value.first.return_value = conflicting_user
+    query_first.return_value = conflicting_user
     
-    with pytest.raises(HTTPException) as exc_info:
-        update_user_info(user_data=user_data, current_user=current_user, db=mock_db)
-    
-    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
-    assert str(exc_info.value.detail) == "Username already taken"
+    assert_http_error(lambda: update_user_info(user_data=user_data, current_user=current_user, db=mock_db), status.HTTP_400_BAD_REQUEST, "Username already taken")
 
-def test_update_user_info_email_conflict(mock_db) -> None:
+def test_update_user_info_email_conflict(mock_db, query_first) -> None:
     current_user = mock_user(1)
     user_data = mock_user_update_data(email="existing@example.com")
     conflicting_user = mock_user(2, "otheruser", "existing@example.com")
     
     # SINGLE QUERY MOCK: Return conflicting user on first database query
-    mock_db.query.return_value.filter.return_value.first.return_value = conflicting_user
-    
-    with pytest.raises(HTTPException) as exc_info:
-        update_user_info(user_data=user_data, current_user=current_user, db=mock_db)
+    query_first.return_value = conflicting_user
     
-    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
-    assert str(exc_info.value.detail) == "Email already taken"
+    assert_http_error(lambda: update_user_info(user_data=user_data, current_user=current_user, db=mock_db), status.HTTP_400_BAD_REQUEST, "Email already taken")
 
-@patch('app.api.routes.auth_routes.get_password_hash')  # Patch where it's used
+@patch.object(auth_routes, 'get_password_hash')  # Patch where it's used
 def test_update_user_info_password_change_success(mock_hash, mock_db) -> None:
     """
     PASSWORD UPDATE TESTING: Tests secure password change workflow.
@@ -342,21 +316,18 @@ def test_update_user_info_password_change_success(mock_hash, mock_db) -> None:
     """
     current_user = mock_user()
     user_data = mock_user_update_data(password="newpassword123")
-    updated_user = mock_user()
     
     mock_hash.return_value = "$2b$12$NEW_HASHED_PASSWORD_HERE"
-    # For password-only updates, no conflict checks should happen
-    mock_db.query.return_value.filter.return_value.first.return_value = updated_user
-    mock_db.query.return_value.filter.return_value.update = MagicMock()
-    mock_db.commit = MagicMock()
     
     result: Any = update_user_info(user_data=user_data, current_user=current_user, db=mock_db)
     
     # SECURITY VERIFICATION: Ensure password was hashed before storage
     mock_hash.assert_called_once_with("newpassword123")
+    assert result.hashed_password == "$2b$12$NEW_HASHED_PASSWORD_HERE"
     
-    expected_update_data = {'hashed_password': '$2b$12$NEW_HASHED_PASSWORD_HERE'}
-    mock_db.query.return_value.filter.return_value.update.assert_called_once_with(expected_update_data)
+    # For password-only updates, no conflict checks should happen
+    mock_db.query.assert_not_called()
+    mock_db.commit.assert_called_once()
 
 def test_update_user_info_no_changes_provided(mock_db) -> None:
     """
@@ -376,6 +347,21 @@ def test_update_user_info_no_changes_provided(mock_db) -> None:
     mock_db.query.assert_not_called()
     mock_db.commit.assert_not_called()
 
+def test_update_user_info_unchanged_values_skip_database(mock_db, no_cache) -> None:
+    """
+    UNCHANGED FIELDS: UserUpdate requires email, so clients resend the current one.
+    Values equal to what the user already has are not changes - no conflict query, no commit.
+    """
+    current_user = mock_user()
+    user_data = mock_user_update_data(username="testuser", email="test@example.com")
+    
+    result: Any = update_user_info(user_data=user_data, current_user=current_user, db=mock_db)
+    
+    assert result is current_user
+    mock_db.query.assert_not_called()
+    mock_db.commit.assert_not_called()
+    no_cache.assert_not_called()
+
 # ================================
 # USER DELETION TESTS
 # ================================
@@ -385,7 +371,7 @@ def test_delete_user_account_success(mock_db) -> None:
     DELETE OPERATION TESTING: Tests user account deletion.
     
     TRANSACTION CONCEPTS:
-    - delete() marks object for deletion
+    - Bulk query(...).delete() removes rows without loading them
     - commit() actually removes from database
     - Soft deletes (marking as inactive) vs hard deletes could be implemented
     
@@ -393,13 +379,13 @@ def test_delete_user_account_success(mock_db) -> None:
     """
     current_user = mock_user()
     
-    mock_db.delete = MagicMock()
-    mock_db.commit = MagicMock()
-    
     result: Any = delete_user(current_user=current_user, db=mock_db)
     
     assert result is None
     
     # TRANSACTION VERIFICATION: Ensure proper delete sequence
-    mock_db.delete.assert_called_once_with(current_user)
+    # Events and the user go in bulk DELETEs, share rows via execute()
+    assert mock_db.query.return_value.filter.return_value.delete.call_count == 2
+    mock_db.execute.assert_called_once()
+    mock_db.delete.assert_not_called()
     mock_db.commit.assert_called_once()
\ No newline at end of file
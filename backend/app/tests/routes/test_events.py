@@ -8,90 +8,69 @@
 #test that an event can be deleted for the current user
 #test that an event cannot be deleted if it does not exist or belong to current user
 
+import json
 import pytest
+from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
-from fastapi import HTTPException
+from app.api.routes import events
 from app.api.routes.events import get_events, create_event, update_event, delete_event
 from app.models.events import Event
+from app.tests.helpers import assert_http_error, assert_query_chain
 from typing import List, Any
 
-@pytest.fixture
-def mock_db():
-    """Mock database session."""
-    db = MagicMock()
-    return db
-
-def mock_event():
-    """Mock event object for testing."""
-    event = MagicMock(spec=Event)
-    event.id = 1
-    event.title = "Test Event"
-    event.description = "This is a test event."
-    event.date = "2023-10-01"
-    event.owner_id = 1
-    return event
-
 def test_get_events_empty_db(mock_db) -> None:
-    """Test that no events are returned when the database is empty."""
+    """Test that an empty list is returned when the user has no events."""
     mock_db.query.return_value.filter.return_value.all.return_value = []
 
-    with pytest.raises(HTTPException) as exc_info:
-        get_events(db=mock_db, current_user=MagicMock(id=1))
+    response = get_events(db=mock_db, current_user=SimpleNamespace(id=1, username="testuser1"))
 
-    assert exc_info.value.status_code == 404
-    assert str(exc_info.value.detail) == "No events found"
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == []
 
-    mock_db.query.assert_called_once_with(Event)
-    mock_db.query.return_value.filter.assert_called_once()
-    mock_db.query.return_value.filter.return_value.all.assert_called_once()
+    assert_query_chain(mock_db, Event, "filter", "all")
 
-def test_update_event_not_found(mock_db) -> None:
-    """Test that update raises 404 when event doesn't exist."""
-    Test_user_4 = MagicMock(id=4, username="testuser1")
-    
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+# The owner check is part of the query filter, so a missing event and someone else's event look the same
+@pytest.mark.parametrize("event_id,user_id", [(999, 4), (6, 6)], ids=["missing", "wrong_owner"])
+def test_update_event_missing_or_foreign(mock_db, query_first, event_id, user_id) -> None:
+    """Test that update raises 404 when the event doesn't exist or belongs to another user."""
+    query_first.return_value = None
     
-    with pytest.raises(HTTPException) as exc_info:
-        update_event(db=mock_db, event_id=999, event_update=MagicMock(), current_user=Test_user_4)
-    
-    assert exc_info.value.status_code == 404
-    assert str(exc_info.value.detail) == "Event not found"
+    assert_http_error(lambda: update_event(db=mock_db, event_id=event_id, event_update=MagicMock(), current_user=SimpleNamespace(id=user_id, username="testuser1")), 404, "Event not found")
+
+    assert_query_chain(mock_db, Event, "filter")
+    mock_db.commit.assert_not_called()
 
 def test_get_events_returns_events_with_correct_data(mock_db) -> None:
-    Test_user_1 = MagicMock(id=1, username="testuser1")
-    Test_event_1 = MagicMock(id=1, title="Test Event 1", owner_id=Test_user_1.id)
+    Test_user_1 = SimpleNamespace(id=1, username="testuser1")
+    Test_event_1 = SimpleNamespace(
+        id=1, title="Test Event 1", description=None, location=None, owner_id=Test_user_1.id,
+        start_time=datetime(2023, 10, 1, 9, 0), end_time=datetime(2023, 10, 1, 10, 0),
+        created_at=datetime(2023, 9, 1), updated_at=datetime(2023, 9, 1),
+    )
 
     mock_query = MagicMock()
     mock_query.all.return_value = [Test_event_1]
     mock_db.query.return_value.filter.return_value = mock_query
 
-    result: List[Any] = get_events(db=mock_db, current_user=Test_user_1)
+    result: List[Any] = json.loads(get_events(db=mock_db, current_user=Test_user_1).body)
 
     assert len(result) == 1
-    assert result[0].id == 1
+    assert result[0]["id"] == 1
 
-    assert result[0].title == "Test Event 1"
-    assert result[0].owner_id == Test_user_1.id
+    assert result[0]["title"] == "Test Event 1"
+    assert result[0]["owner_id"] == Test_user_1.id
+    assert result[0]["start_time"] == "2023-10-01T09:00:00"
 
-    mock_db.query.assert_called_once_with(Event)
-    mock_db.query.return_value.filter.assert_called_once()
-    mock_db.query.return_value.filter.return_value.all.assert_called_once()
+    assert_query_chain(mock_db, Event, "filter", "all")
 
-@patch('app.api.routes.events.Event')
+@patch.object(events, 'Event')
 def test_create_event(mock_event, mock_db) -> None:
     """Test that an event can be created for the current user."""
-    Test_user_4 = MagicMock(id=4, username="testuser1")
-    Test_event_4 = MagicMock(id=4, title="Test Event 4", owner_id=Test_user_4.id)
+    Test_user_4 = SimpleNamespace(id=4, username="testuser1")
+    Test_event_4 = SimpleNamespace(id=4, title="Test Event 4", owner_id=Test_user_4.id)
     
     mock_event.return_value = Test_event_4
-    
-    mock_db.add = MagicMock()
-    mock_db.commit = MagicMock()
-    mock_db.refresh = MagicMock()
-
-    mock_db.add.return_value = None
-    mock_db.commit.return_value = None
-    mock_db.refresh.return_value = None
 
     result: Any= create_event(db=mock_db, event=MagicMock() , current_user=Test_user_4)
 
@@ -100,21 +79,17 @@ def test_create_event(mock_event, mock_db) -> None:
 
     mock_db.add.assert_called_once()
     mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(result)
+    mock_db.refresh.assert_not_called()
 
-@patch('app.api.routes.events.Event')
-def test_update_event(mock_event, mock_db) -> None:
+@patch.object(events, 'Event')
+def test_update_event(mock_event, mock_db, query_first) -> None:
     """Test that an event can be updated for the current user."""
-    Test_user_4 = MagicMock(id=4, username="testuser1")
-    Test_event_4 = MagicMock(id=4, title="Test Event 4", owner_id=Test_user_4.id)
+    Test_user_4 = SimpleNamespace(id=4, username="testuser1")
+    Test_event_4 = SimpleNamespace(id=4, title="Test Event 4", owner_id=Test_user_4.id)
     
     mock_event.return_value = Test_event_4
     
-    mock_db.query.return_value.filter.return_value.first.return_value = Test_event_4
-    mock_db.commit = MagicMock()
-    mock_db.refresh = MagicMock()
-    mock_db.commit.return_value = None
-    mock_db.refresh.return_value = None
+    query_first.return_value = Test_event_4
 
     result: Any= update_event(db=mock_db, event_id=MagicMock, event_update=MagicMock() , current_user=Test_user_4)
 
@@ -123,61 +98,19 @@ def test_update_event(mock_event, mock_db) -> None:
 
     mock_db.commit.assert_called_once()
     mock_db.refresh.assert_called_once_with(result)
-    mock_db.query.return_value.filter.return_value.first.assert_called_once()
+    query_first.assert_called_once()
 
-@patch('app.api.routes.events.Event')
-def test_event_not_found(mock_event, mock_db) -> None:
-    """Test that when event isn't found it raises an error."""
-    Test_user_5 = MagicMock(id=5, username="testuser1")
-    
-    mock_db.query.return_value.filter.return_value.first.return_value = None
-    
-    with pytest.raises(HTTPException) as exc_info:
-        update_event(db=mock_db, event_id=999, event_update=MagicMock(), current_user=Test_user_5)
-    
-    assert exc_info.value.status_code == 404
-    assert str(exc_info.value.detail) == "Event not found"
-
-    mock_db.query.assert_called_once_with(mock_event)
-    mock_db.query.return_value.filter.assert_called_once()
-
-@patch('app.api.routes.events.Event')
-def test_delete_event(mock_event, mock_db) -> None:
+@patch.object(events, 'Event')
+def test_delete_event(mock_event, mock_db, query_first) -> None:
     """Test that an event can be deleted for the current user."""
-    Test_user_5 = MagicMock(id=5, username="testuser1")
-    Test_event_5 = MagicMock(id=5, title="Test Event 4", owner_id=Test_user_5.id)
+    Test_user_5 = SimpleNamespace(id=5, username="testuser1")
+    Test_event_5 = SimpleNamespace(id=5, title="Test Event 4", owner_id=Test_user_5.id)
     
     mock_event.return_value = Test_event_5
     
-    mock_db.query.return_value.filter.return_value.first.return_value = Test_event_5
-    mock_db.delete = MagicMock()
-    mock_db.commit = MagicMock()
-    mock_db.commit.return_value = None
-    mock_db.delete.return_value = None
+    query_first.return_value = Test_event_5
     
     result: Any= delete_event(db=mock_db, event_id=5, current_user=Test_user_5)
 
     mock_db.delete.assert_called_once_with(Test_event_5)
-    mock_db.query.return_value.filter.return_value.first.assert_called_once()
-
-@patch('app.api.routes.events.Event')
-def test_update_event_wrong_owner(mock_event, mock_db) -> None:
-    """Test that an event cannot be updated if it does not belong to the current user."""
-    Test_user_6 = MagicMock(id=6, username="testuser1")
-    Test_event_6 = MagicMock(id=6, title="Test Event 6", owner_id=7)
-
-    mock_db = MagicMock()
-    mock_db.query.return_value.filter.return_value.first.return_value = None
-    mock_db.commit = MagicMock()
-    mock_db.refresh = MagicMock()
-    mock_db.commit.return_value = None
-    mock_db.refresh.return_value = None
-    
-    with pytest.raises(HTTPException) as exc_info:
-        update_event(db=mock_db, event_id=6, event_update=MagicMock(), current_user=Test_user_6)
-    
-    assert exc_info.value.status_code == 404
-    assert str(exc_info.value.detail) == "Event not found"
-    
-    mock_db.query.assert_called_once_with(mock_event)
-    mock_db.query.return_value.filter.assert_called_once()
+    query_first.assert_called_once()
@@ -1,95 +1,178 @@
-# test that 404 is raised when no users are found
+# test that an empty page is returned when no users are found
 # test that id is returned correctly when fetching users
-# test that correct error message is returned when database is empty
+# test that a full page of users returns a cursor for the next page
+# test that cached users are served without touching the database
+# test that a stale cached user schedules a background refresh
+# test that refreshing a user who has since been deleted drops their cache entry
 
+import json
 import pytest
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 from typing import Any, List
 from app.models.user import User
-from app.api.routes.users import get_users, get_user_by_id
-from fastapi import HTTPException
+from app.tests.helpers import assert_http_error, assert_query_chain
+from app.api.routes import users
+from app.api.routes.users import get_users, get_user_by_id, refresh_user
+from fastapi import BackgroundTasks, Response
 
-@pytest.fixture
-def mock_db():
-    """Mock database session."""
-    db = MagicMock()
-    return db
+@pytest.fixture(autouse=True)
+def mock_cache():
+    """Patch the Redis cache helpers so every test starts with a cache miss."""
+    with patch.object(users, 'cache_hget', return_value=None) as mock_get, \
+         patch.object(users, 'cache_hset') as mock_set, \
+         patch.object(users, 'cache_get_swr', return_value=(None, False)), \
+         patch.object(users, 'cache_set_swr'):
+        yield mock_get, mock_set
+
+def users_page_query(mock_db) -> MagicMock:
+    """The query(...).filter(...).order_by(...).limit(...) chain used by get_users."""
+    return mock_db.query.return_value.filter.return_value.order_by.return_value.limit.return_value
 
 def test_get_users_empty_db(mock_db) -> None:
-    """Test that no users are returned when the database is empty."""
-    mock_db.query.return_value.all.return_value = []
+    """Test that an empty page, not a 404, is returned when the database is empty."""
+    users_page_query(mock_db).all.return_value = []
     
-    with pytest.raises(HTTPException) as exc_info:
-        get_users(db=mock_db)
+    response = get_users(cursor=0, limit=100, db=mock_db)
         
-    assert exc_info.value.status_code == 404
-    assert str(exc_info.value.detail) == "No users found"
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"items": [], "next_cursor": None}
 
-    mock_db.query.assert_called_once_with(User)
-    mock_db.query.return_value.all.assert_called_once()
+    mock_db.query.assert_called_once_with(User.id, User.username, User.email)
+    users_page_query(mock_db).all.assert_called_once()
 
 def test_get_users_returns_users_with_correct_data(mock_db) -> None:
     """Test that id is returned correctly when fetching users."""
-    test_user_1 = MagicMock()
+    test_user_1 = SimpleNamespace()
     test_user_1.id = 1
     test_user_1.username = "testuser1"
     test_user_1.email = "test1@email.com"
     
-    test_user_2 = MagicMock()
+    test_user_2 = SimpleNamespace()
     test_user_2.id = 2
     test_user_2.username = "testuser2"
     test_user_2.email = "test2@email.com"
 
-    mock_query = MagicMock()
-    mock_query.all.return_value = [test_user_1, test_user_2]
-    mock_db.query.return_value = mock_query
+    users_page_query(mock_db).all.return_value = [test_user_1, test_user_2]
 
-    # Type annotation to help with type checker
-    result: List[Any] = get_users(db=mock_db)
+    response = get_users(cursor=0, limit=100, db=mock_db)
+    assert response.media_type == "application/json"
+    result = json.loads(response.body)
 
-    assert len(result) == 2
-    assert result[0].id == 1
-    assert result[0].username == "testuser1"
-    assert result[0].email == "test1@email.com"
+    assert len(result["items"]) == 2
+    assert result["items"][0]["id"] == 1
+    assert result["items"][0]["username"] == "testuser1"
+    assert result["items"][0]["email"] == "test1@email.com"
     
-    assert result[1].id == 2
-    assert result[1].username == "testuser2"
-    assert result[1].email == "test2@email.com"
+    assert result["items"][1]["id"] == 2
+    assert result["items"][1]["username"] == "testuser2"
+    assert result["items"][1]["email"] == "test2@email.com"
+
+    # Fewer rows than the limit means this was the last page
+    assert result["next_cursor"] is None
     
-    mock_db.query.assert_called_once_with(User)
-    mock_db.query.return_value.all.assert_called_once()
+    mock_db.query.assert_called_once_with(User.id, User.username, User.email)
+    users_page_query(mock_db).all.assert_called_once()
+
+def test_get_users_full_page_returns_next_cursor(mock_db) -> None:
+    """Test that a full page points the client at the last id it saw."""
+    test_user_1 = SimpleNamespace(id=4, username="testuser4", email="test4@email.com")
+    test_user_2 = SimpleNamespace(id=7, username="testuser7", email="test7@email.com")
+    users_page_query(mock_db).all.return_value = [test_user_1, test_user_2]
+
+    result = json.loads(get_users(cursor=3, limit=2, db=mock_db).body)
+
+    assert [user["id"] for user in result["items"]] == [4, 7]
+    assert result["next_cursor"] == 7
+    mock_db.query.return_value.filter.return_value.order_by.return_value.limit.assert_called_once_with(2)
+
+def test_get_users_caches_serialized_page(mock_db, mock_cache) -> None:
+    """Test that a cache miss stores the serialized page."""
+    _, mock_set = mock_cache
+    test_user_1 = SimpleNamespace(id=1, username="testuser1", email="test1@email.com")
+    users_page_query(mock_db).all.return_value = [test_user_1]
+
+    response = get_users(cursor=0, limit=100, db=mock_db)
+
+    mock_set.assert_called_once()
+    key, field, body, ttl = mock_set.call_args.args
+    assert response.body == body
+    assert key == "users:all"
+    assert field == "0:100"
+    assert json.loads(body) == {
+        "items": [{"id": 1, "username": "testuser1", "email": "test1@email.com"}],
+        "next_cursor": None,
+    }
+
+def test_get_users_cache_hit_skips_database(mock_db, mock_cache) -> None:
+    """Test that a cache hit returns the stored JSON without querying the database."""
+    mock_get, mock_set = mock_cache
+    mock_get.return_value = b'{"items":[{"id":1,"username":"testuser1","email":"test1@email.com"}],"next_cursor":null}'
+
+    result: Any = get_users(cursor=0, limit=100, db=mock_db)
+
+    assert isinstance(result, Response)
+    assert result.body == mock_get.return_value
+    assert result.media_type == "application/json"
+    mock_db.query.assert_not_called()
+    mock_set.assert_not_called()
 
 def test_get_users_by_id(mock_db) -> None:
     """Tests that the database can get a user by their id"""
     # Mock user data for testing by creating a user with id 3
-    test_user_3 = MagicMock()
+    test_user_3 = SimpleNamespace()
     test_user_3.id = 3
+    test_user_3.username = "testuser3"
+    test_user_3.email = "test3@email.com"
 
     mock_query = MagicMock()
     # mock the query, then filter it to return the user with id 3
     mock_query.filter.return_value.first.return_value= test_user_3
     #mock the query to return the mock_query
-    mock_db.query.return_value = mock_query
+    mock_db.query.return_value.options.return_value = mock_query
 
     # tells the type checker "this result can be any type, don't try to enforce SQLAlchemy rules on it
-    result: Any = get_user_by_id(user_id=3, db=mock_db)
+    result: Any = get_user_by_id(user_id=3, background_tasks=BackgroundTasks(), db=mock_db)
 
     assert result.id == 3
         
-    mock_db.query.assert_called_once_with(User)
-    mock_db.query.return_value.filter.return_value.first.assert_called_once()
+    assert_query_chain(mock_db, User, "options", "filter", "first")
 
 def test_get_user_by_id_not_found(mock_db) -> None:
     """Test that a 404 error is raised when the user is not found."""
     mock_query = MagicMock()
     mock_query.filter.return_value.first.return_value = None
-    mock_db.query.return_value = mock_query
+    mock_db.query.return_value.options.return_value = mock_query
 
-    with pytest.raises(HTTPException) as exc_info:
-        get_user_by_id(user_id=999, db=mock_db)
-        
-    assert exc_info.value.status_code == 404
-    assert str(exc_info.value.detail) == "User not found"
+    assert_http_error(lambda: get_user_by_id(user_id=999, background_tasks=BackgroundTasks(), db=mock_db), 404, "User not found")
+
+    assert_query_chain(mock_db, User, "options", "filter", "first")
+
+def test_get_user_by_id_stale_cache_schedules_refresh(mock_db) -> None:
+    """Test that a stale entry is served immediately and refreshed in the background."""
+    cached = b'{"id":3,"username":"testuser3","email":"test3@email.com"}'
+    background_tasks = BackgroundTasks()
+
+    with patch.object(users, 'cache_get_swr', return_value=(cached, True)):
+        result: Any = get_user_by_id(user_id=3, background_tasks=background_tasks, db=mock_db)
+
+    assert isinstance(result, Response)
+    assert result.body == cached
+    mock_db.query.assert_not_called()
+
+    assert len(background_tasks.tasks) == 1
+    assert background_tasks.tasks[0].func is refresh_user
+    assert background_tasks.tasks[0].args == (3,)
+
+def test_refresh_user_deleted_user_drops_cache_entry(mock_db) -> None:
+    """Test that the background refresh deletes user:{id} when the user no longer exists."""
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+
+    with patch.object(users, 'SessionLocal', return_value=mock_db), \
+         patch.object(users, 'cache_delete') as mock_delete, \
+         patch.object(users, 'cache_set_swr') as mock_set_swr:
+        refresh_user(5)
 
-    mock_db.query.assert_called_once_with(User)
-    mock_db.query.return_value.filter.return_value.first.assert_called_once()
\ No newline at end of file
+    mock_delete.assert_called_once_with("user:5")
+    mock_set_swr.assert_not_called()
+    mock_db.close.assert_called_once()
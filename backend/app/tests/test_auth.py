@@ -0,0 +1,111 @@
+# test that a minted token decodes with PyJWT, including a non-ASCII subject
+# test that datetime claims are encoded as NumericDate, like jwt.encode does
+# test that a token with a tampered signature is rejected
+# test that a token past its exp is rejected
+# test that a cached token past its exp is rejected instead of served from the cache
+# test that invalid or tampered tokens are never cached
+# test that a repeat verification of a valid token skips jwt.decode
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+
+from app.utils import auth
+from app.utils.auth import create_access_token, verify_token
+from schemas import TokenData
+
+CREDENTIALS_EXCEPTION = HTTPException(status_code=401, detail="Could not validate credentials")
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Every test starts and ends with an empty verify_token cache."""
+    auth._token_cache.clear()
+    yield
+    auth._token_cache.clear()
+
+def decode(token: str) -> dict:
+    return jwt.decode(token, auth.settings.secret_key, algorithms=["HS256"])
+
+def tamper(token: str) -> str:
+    """Flip the first character of the signature segment."""
+    head, _, signature = token.rpartition(".")
+    return f"{head}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
+
+def test_create_access_token_decodes_with_pyjwt() -> None:
+    """Test that the hand-signed token is a standard HS256 JWT."""
+    token = create_access_token({"sub": "zoë_日本"}, expires_delta=timedelta(minutes=5))
+
+    payload = decode(token)
+
+    assert payload["sub"] == "zoë_日本"
+    assert payload["exp"] - time.time() == pytest.approx(300, abs=5)
+    assert jwt.get_unverified_header(token) == {"alg": "HS256", "typ": "JWT"}
+
+def test_create_access_token_converts_datetime_claims() -> None:
+    """Test that datetime claims become NumericDate seconds instead of failing to serialise."""
+    issued_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    payload = jwt.decode(
+        create_access_token({"sub": "x", "iat": issued_at, "nbf": issued_at.replace(tzinfo=None)}),
+        auth.settings.secret_key,
+        algorithms=["HS256"],
+    )
+
+    assert payload["iat"] == int(issued_at.timestamp())
+    assert payload["nbf"] == int(issued_at.timestamp())  # naive datetimes are taken as UTC
+
+def test_tampered_signature_is_rejected() -> None:
+    """Test that changing the signature invalidates the token."""
+    token = tamper(create_access_token({"sub": "testuser"}))
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode(token)
+    with pytest.raises(HTTPException):
+        verify_token(token, CREDENTIALS_EXCEPTION)
+
+def test_expired_token_is_rejected() -> None:
+    """Test that a token past its exp fails verification."""
+    token = create_access_token({"sub": "testuser"}, expires_delta=timedelta(seconds=-10))
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode(token)
+    with pytest.raises(HTTPException):
+        verify_token(token, CREDENTIALS_EXCEPTION)
+
+def test_cached_token_past_exp_is_rejected() -> None:
+    """Test that a cache hit is re-checked against exp rather than trusted."""
+    token = create_access_token({"sub": "testuser"}, expires_delta=timedelta(seconds=-10))
+    # As if it had been cached while still valid
+    auth._token_cache[token] = (TokenData(username="testuser"), time.time() - 10)
+
+    with pytest.raises(HTTPException):
+        verify_token(token, CREDENTIALS_EXCEPTION)
+
+    assert token not in auth._token_cache
+
+@pytest.mark.parametrize("token", [
+    tamper(create_access_token({"sub": "testuser"})),
+    "not.a.jwt",
+], ids=["tampered", "garbage"])
+def test_invalid_token_is_not_cached(token) -> None:
+    """Test that a token failing verification never lands in the cache."""
+    with pytest.raises(HTTPException):
+        verify_token(token, CREDENTIALS_EXCEPTION)
+
+    assert token not in auth._token_cache
+    assert len(auth._token_cache) == 0
+
+def test_repeat_verification_skips_decode() -> None:
+    """Test that the second verification of a valid token is served from the cache."""
+    token = create_access_token({"sub": "testuser"})
+
+    with patch.object(auth.jwt, 'decode', wraps=jwt.decode) as mock_decode:
+        first = verify_token(token, CREDENTIALS_EXCEPTION)
+        second = verify_token(token, CREDENTIALS_EXCEPTION)
+
+    assert first.username == second.username == "testuser"
+    mock_decode.assert_called_once()
@@ -0,0 +1,127 @@
+# test that a Redis error is treated as a miss and counted
+# test that Redis is bypassed for the retry window after a failure, then tried again
+# test that CACHE_ENABLED=false never touches Redis
+# test that hits and misses are counted
+# test that cache_hset writes HSET and EXPIRE ... NX in one pipeline
+# test that a fresh stale-while-revalidate hit doesn't ask for a refresh
+# test that only the first caller to see a stale entry wins the refresh lock
+# test that cache_set_swr stores the entry, expires it after ttl + stale_ttl and clears the lock
+
+import time
+import pytest
+import redis
+from unittest.mock import MagicMock, patch
+
+from app.core import cache
+from app.core.cache import (
+    cache_delete, cache_get_swr, cache_hget, cache_hset, cache_set_swr, cache_stats, get_redis
+)
+
+@pytest.fixture
+def redis_client():
+    """A mock Redis client installed as the shared client, with fresh availability state and counters."""
+    client = MagicMock(spec=redis.Redis)
+    with patch.object(cache, '_client', client), \
+         patch.object(cache, '_unavailable_until', 0.0), \
+         patch.object(cache.settings, 'cache_enabled', True):
+        cache._stats.clear()
+        yield client
+    cache._stats.clear()
+
+def test_redis_error_is_a_miss(redis_client) -> None:
+    """Test that a RedisError returns None and increments the error counter."""
+    redis_client.hget.side_effect = redis.ConnectionError("down")
+
+    assert cache_hget("users:all", "0:100") is None
+    assert cache_stats()["errors"] == 1
+
+def test_redis_bypassed_until_retry_window_passes(redis_client) -> None:
+    """Test that after a failure get_redis() returns None until _unavailable_until, then the client again."""
+    redis_client.delete.side_effect = redis.TimeoutError("slow")
+
+    with patch.object(cache.time, 'monotonic', return_value=1000.0):
+        cache_delete("user:1")
+        assert cache._unavailable_until == 1000.0 + cache._RETRY_AFTER_SECONDS
+        assert get_redis() is None
+        # Further calls during the window don't reach Redis at all
+        assert cache_hget("users:all", "0:100") is None
+    redis_client.hget.assert_not_called()
+
+    with patch.object(cache.time, 'monotonic', return_value=1000.0 + cache._RETRY_AFTER_SECONDS + 1):
+        assert get_redis() is redis_client
+
+def test_cache_disabled_skips_redis(redis_client) -> None:
+    """Test that with caching disabled every helper is a no-op miss."""
+    with patch.object(cache.settings, 'cache_enabled', False):
+        assert get_redis() is None
+        assert cache_hget("users:all", "0:100") is None
+        cache_hset("users:all", "0:100", b"[]", 60)
+
+    assert redis_client.method_calls == []
+
+def test_hits_and_misses_are_counted(redis_client) -> None:
+    """Test that cache_stats() reflects hits and misses from cache_hget."""
+    redis_client.hget.side_effect = [b"cached", None, None]
+
+    assert cache_hget("users:all", "0:100") == b"cached"
+    cache_hget("users:all", "100:100")
+    cache_hget("users:all", "200:100")
+
+    assert cache_stats() == {"hits": 1, "misses": 2, "errors": 0}
+
+def test_cache_hset_pipelines_hset_and_expire_nx(redis_client) -> None:
+    """Test that a page is stored with HSET and the hash TTL set only if it has none, in one round trip."""
+    pipe = redis_client.pipeline.return_value
+
+    cache_hset("users:all", "0:100", b"[]", 60)
+
+    redis_client.pipeline.assert_called_once_with()
+    pipe.hset.assert_called_once_with("users:all", "0:100", b"[]")
+    pipe.expire.assert_called_once_with("users:all", 60, nx=True)
+    pipe.execute.assert_called_once_with()
+
+def swr_entry(body: bytes, fresh_for: float) -> dict:
+    """An HGETALL reply for an entry that is fresh for fresh_for more seconds (negative = stale)."""
+    return {b"body": body, b"fresh_until": str(time.time() + fresh_for).encode()}
+
+def test_swr_fresh_hit_needs_no_refresh(redis_client) -> None:
+    """Test that an entry inside its fresh window is served without taking the refresh lock."""
+    redis_client.hgetall.return_value = swr_entry(b'{"id":3}', 30)
+
+    assert cache_get_swr("user:3") == (b'{"id":3}', False)
+    redis_client.set.assert_not_called()
+
+def test_swr_miss(redis_client) -> None:
+    """Test that a missing entry is (None, False)."""
+    redis_client.hgetall.return_value = {}
+
+    assert cache_get_swr("user:3") == (None, False)
+    assert cache_stats()["misses"] == 1
+
+def test_swr_stale_hit_only_first_caller_refreshes(redis_client) -> None:
+    """Test that of two callers seeing the same stale entry, only the one that wins SET NX refreshes it."""
+    redis_client.hgetall.return_value = swr_entry(b'{"id":3}', -5)
+    locks = set()
+
+    def set_nx(key, value, nx=False, ex=None):
+        if nx and key in locks:
+            return None
+        locks.add(key)
+        return True
+    redis_client.set.side_effect = set_nx
+
+    assert cache_get_swr("user:3") == (b'{"id":3}', True)
+    assert cache_get_swr("user:3") == (b'{"id":3}', False)
+    redis_client.set.assert_called_with("user:3:refreshing", 1, nx=True, ex=cache.settings.cache_refresh_lock_seconds)
+
+def test_swr_set_expires_after_stale_window_and_clears_lock(redis_client) -> None:
+    """Test that cache_set_swr writes body and fresh_until, expires at ttl + stale_ttl and deletes the lock."""
+    pipe = redis_client.pipeline.return_value
+
+    with patch.object(cache.time, 'time', return_value=1000.0):
+        cache_set_swr("user:3", b'{"id":3}', 60, 30)
+
+    pipe.hset.assert_called_once_with("user:3", mapping={"body": b'{"id":3}', "fresh_until": 1060.0})
+    pipe.expire.assert_called_once_with("user:3", 90)
+    pipe.delete.assert_called_once_with("user:3:refreshing")
+    pipe.execute.assert_called_once_with()
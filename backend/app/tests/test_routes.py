@@ -0,0 +1,122 @@
+# test that no two routes are registered for the same method and path
+# test that a request goes through the full app (middleware, routing, serialisation)
+# test that GET /events/ returns a body matching its documented schema
+# test that the OpenAPI schema is built during startup
+# test that routes returning pre-serialised bytes still document their 200 schema
+# test that /health reports the running environment
+# test that startup caps the route threadpool at the DB pool's capacity, and only when it has one
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+import pytest
+from anyio import to_thread
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+from app.api.routes import users
+from app.config.settings import get_settings
+from app.utils.auth import get_current_user
+import database
+import main
+from main import app
+from schemas import EventResponse, EventResponseList
+
+def test_no_duplicate_routes() -> None:
+    """Test that every (method, path) pair is served by exactly one handler."""
+    pairs = Counter(
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    )
+    duplicates = [pair for pair, count in pairs.items() if count > 1]
+
+    assert duplicates == []
+
+def test_get_users_over_http(client, client_db) -> None:
+    """Test that GET /users/ is served through the app with the overridden session."""
+    test_user = SimpleNamespace(id=1, username="testuser1", email="test1@email.com")
+    client_db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [test_user]
+
+    with patch.object(users, 'cache_hget', return_value=None), patch.object(users, 'cache_hset'):
+        response = client.get("/users/")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [{"id": 1, "username": "testuser1", "email": "test1@email.com"}],
+        "next_cursor": None,
+    }
+    assert "X-Correlation-ID" in response.headers
+
+def test_get_events_over_http(client, client_db) -> None:
+    """Test that GET /events/ returns a list matching EventResponse through the app."""
+    now = datetime(2024, 1, 1, 9, 0)
+    test_event = SimpleNamespace(
+        id=1, title="Standup", description=None, start_time=now, end_time=now, location=None,
+        created_at=now, updated_at=now, owner_id=1,
+    )
+    client_db.query.return_value.filter.return_value.all.return_value = [test_event]
+    client.app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, username="testuser1")
+
+    try:
+        response = client.get("/events/events/")
+    finally:
+        del client.app.dependency_overrides[get_current_user]
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert EventResponseList.validate_json(response.content) == [EventResponse.model_validate(test_event)]
+
+def test_openapi_schema_built_at_startup(client) -> None:
+    """Test that startup leaves the OpenAPI schema cached, so /docs doesn't build it."""
+    assert client.app.openapi_schema is not None
+
+@pytest.mark.parametrize("path,schema", [
+    ("/users/", {"$ref": "#/components/schemas/UserPage"}),
+    ("/events/events/", {"type": "array", "items": {"$ref": "#/components/schemas/EventResponse"}}),
+], ids=["users", "events"])
+def test_openapi_documents_raw_response_routes(client, path, schema) -> None:
+    """Test that routes returning a raw Response keep their body schema in the OpenAPI document."""
+    response = client.app.openapi()["paths"][path]["get"]["responses"]["200"]
+
+    documented = response["content"]["application/json"]["schema"]
+    # Compare only the keys we care about - FastAPI adds a generated title to inline schemas
+    assert {key: documented.get(key) for key in schema} == schema
+
+def test_health_reports_configured_environment(client) -> None:
+    """Test that /health reports the loaded settings' environment, not the class default."""
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["environment"] == get_settings().environment.value
+
+@pytest.mark.parametrize("poolclass,sized,max_overflow,expected", [
+    (QueuePool, True, 10, 30),
+    (QueuePool, True, -1, None),
+    (QueuePool, False, 10, None),
+    (NullPool, False, 10, None),
+    (StaticPool, False, 10, None),
+], ids=["sized_queue_pool", "unlimited_overflow", "unsized_queue_pool", "null_pool", "static_pool"])
+def test_pool_capacity(poolclass, sized, max_overflow, expected) -> None:
+    """Test that only a QueuePool built from the pool settings reports their capacity."""
+    engine = create_engine("sqlite:///:memory:", poolclass=poolclass)
+    sizing = {"pool_size": 20, "max_overflow": max_overflow} if sized else {}
+
+    with patch.dict(database.engine_options, sizing), \
+            patch.object(database.settings, 'db_pool_size', 20), \
+            patch.object(database.settings, 'db_max_overflow', max_overflow):
+        assert database.pool_capacity(engine.pool) == expected
+
+@pytest.mark.parametrize("capacity,expected", [(15, 15), (None, 40)], ids=["bounded_pool", "uncapped_pool"])
+def test_lifespan_sizes_thread_limiter(capacity, expected) -> None:
+    """Test that startup sets the AnyIO limiter to the pool capacity, or leaves AnyIO's default of 40."""
+    async def tokens_during_lifespan() -> int:
+        # The default limiter is per event loop, so each asyncio.run starts from AnyIO's default
+        async with main.lifespan(app):
+            return to_thread.current_default_thread_limiter().total_tokens
+
+    with patch.object(main, 'pool_capacity', return_value=capacity), patch.object(main, 'init_db'):
+        assert asyncio.run(tokens_during_lifespan()) == expected
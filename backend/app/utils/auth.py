@@ -1,14 +1,22 @@
 # Utility functions for authentication in a FastAPI application
 
 # Standard library imports
+import base64
+import hashlib
+import hmac
+import json
+import time
+from threading import Lock
 from typing import Any, Optional
-from datetime import datetime, timedelta, timezone
+from calendar import timegm
+from datetime import datetime, timedelta
 
 #Third-party imports
-from jose import JWTError, jwt
+import bcrypt
+from cachetools import TTLCache
+import jwt
 from fastapi import status, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 #Local imports
@@ -19,41 +27,95 @@ from app.config.settings import get_settings
 
 settings = get_settings()
 
-# Create a password context for hashing passwords
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Encoded once so signing and verifying don't re-encode the key on every token
+_SECRET_KEY_BYTES = settings.secret_key.encode("utf-8")
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Decoded tokens keyed by the raw bearer string, so repeat requests skip the HMAC + JSON decode.
+# Entries live well under the token lifetime and are re-checked against "exp" on every hit.
+# FastAPI runs sync dependencies in a threadpool, hence the lock.
+_token_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_token_cache_lock = Lock()
+
+# The JOSE header is the same for every token we mint, so encode it once
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+# Registered claims jwt.encode converts from datetime to NumericDate
+_NUMERIC_DATE_CLAIMS = ("exp", "iat", "nbf")
+
+def _encode_password(password: str) -> bytes:
+    """Encode a password for bcrypt, which only looks at the first 72 bytes."""
+    return password.encode("utf-8")[:72]
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(_encode_password(plain_password), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+    """Hash a password using bcrypt with the configured cost factor."""
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(_encode_password(password), salt).decode("utf-8")
+
+def _b64url(data: bytes) -> bytes:
+    """Base64url-encode without padding, as JWT requires."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _sign(payload: dict) -> str:
+    """
+    Encode and HS256-sign a JWT payload using the precomputed header segment.
+    Like jwt.encode, datetime values for exp/iat/nbf become NumericDate seconds
+    (naive datetimes are taken as UTC).
+    """
+    for claim in _NUMERIC_DATE_CLAIMS:
+        if isinstance(payload.get(claim), datetime):
+            payload = {**payload, claim: timegm(payload[claim].utctimetuple())}
+    payload_b64 = _b64url(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    signing_input = _JWT_HEADER_B64 + b"." + payload_b64
+    signature = hmac.new(_SECRET_KEY_BYTES, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("ascii")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
-    return encoded_jwt
+    # "exp" is a NumericDate (seconds since the epoch), so skip building aware datetimes
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else 15 * 60
+    to_encode["exp"] = int(time.time()) + lifetime
+    return _sign(to_encode)
 
 def verify_token(token: str, credentials_exception) -> TokenData:
     """Verify a JWT token and return the token data."""
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+    if cached is not None:
+        token_data, expires_at = cached
+        if expires_at > time.time():
+            return token_data
+        # Expired since it was cached - drop it and let jwt.decode reject it below
+        with _token_cache_lock:
+            _token_cache.pop(token, None)
+
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+        payload = jwt.decode(
+            token,
+            _SECRET_KEY_BYTES,
+            algorithms=["HS256"],
+            options={"require": ["exp", "sub"]},
+        )
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
+
+    with _token_cache_lock:
+        _token_cache[token] = (token_data, payload.get("exp", float("inf")))
     return token_data
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
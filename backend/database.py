@@ -1,15 +1,47 @@
+from typing import Optional
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.models.base import Base
-from app.config.settings import get_settings
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+from app.config.settings import Environment, get_settings
 
 settings = get_settings()
 
+engine_options: dict = {"echo": settings.db_echo}
+if settings.environment == Environment.TESTING:
+    # No pooling in tests so connections never leak between test cases
+    engine_options["poolclass"] = NullPool
+elif not settings.database_url.startswith("sqlite"):
+    # Keep warm connections around instead of reconnecting per request
+    # (SQLite picks its own pool class, and the in-memory one rejects these sizing arguments)
+    engine_options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+    )
+
+if settings.database_url.startswith(("postgresql", "postgres")):
+    # JIT compilation costs more than it saves on short CRUD queries
+    engine_options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms} -c jit=off"}
+
 # Create the SQLAlchemy engine
-engine = create_engine(settings.database_url, echo=True)
+engine = create_engine(settings.database_url, **engine_options)
+
+def pool_capacity(pool: Pool) -> Optional[int]:
+    """
+    Most connections the pool will hand out at once (db_pool_size + db_max_overflow), or None
+    unless it is a QueuePool built from those settings with bounded overflow
+    (NullPool in tests and SQLite's own pool choice are sized elsewhere or not at all).
+    """
+    if isinstance(pool, QueuePool) and "max_overflow" in engine_options and settings.db_max_overflow >= 0:
+        return settings.db_pool_size + settings.db_max_overflow
+    return None
 
 # Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps attributes loaded after commit, so returning a freshly
+# inserted object doesn't trigger another SELECT (ids/timestamps come back via RETURNING)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Create a session to interact with the database
 def get_db():
@@ -1,13 +1,14 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from database import init_db
-from app.config.settings import Settings
-from datetime import datetime
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from database import engine, init_db, pool_capacity
+from app.config.settings import get_settings
+from datetime import datetime, timezone
 from app.core.logging import setup_logging, get_logger
 from app.core.middleware import setup_middleware
+from app.core.cache import close_redis
 
-init_db()  # Initialize the database and create tables
 #importing routes
 from app.api.routes.auth_routes import router as auth_router
 from app.api.routes.events import router as events_router
@@ -15,30 +16,45 @@ from app.api.routes.users import router as users_router
 from app.api.routes.shared import router as shared_router
 
 setup_logging()
+settings = get_settings()
 
 # Get logger for this module
 logger = get_logger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Run at startup rather than import, so importing main (tests, tooling) stays cheap
+    init_db()
+    # Sync routes run on AnyIO worker threads (40 by default). Cap them at what the
+    # DB pool can actually serve so extra requests queue here instead of timing out on
+    # checkout. Pools without a fixed cap (NullPool in tests, SQLite) keep the default.
+    # This is the process-wide default limiter, so it also bounds DB-free sync work:
+    # BackgroundTasks (refresh_user), sync routes like / and /health, and sync dependencies
+    # all queue behind DB checkouts once the pool is saturated. Those are short, so the
+    # trade-off is accepted over threading a separate limiter through every DB route.
+    capacity = pool_capacity(engine.pool)
+    if capacity is not None:
+        to_thread.current_default_thread_limiter().total_tokens = capacity
+    # Build the OpenAPI schema now (FastAPI caches it on app.openapi_schema) rather than on the first /docs hit
+    app.openapi()
+    logger.info("Application startup complete")
+    yield
+    close_redis()
+    logger.info("Application shutdown")
+
 # Create FastAPI app
 app = FastAPI(
     title="WhenWorks Calendar API",
     description="A FastAPI application with proper logging",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serialises responses (including datetimes) far faster than stdlib json
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Set up middleware
 setup_middleware(app)
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application startup complete")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Application shutdown")
-
-app = FastAPI()
-
 app.include_router(auth_router, prefix="/auth", tags=["authentication"])
 app.include_router(events_router, prefix="/events", tags=["events"])
 app.include_router(users_router, prefix="/users", tags=["users"])
@@ -53,8 +69,8 @@ async def health_check():
     """Health check endpoint for Docker."""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow(),
-        "environment": Settings.environment
+        "timestamp": datetime.now(timezone.utc),
+        "environment": settings.environment
     }
 
 # Allows React (port 3002) to call FastAPI (port 8000) - as browsers block cross-origin requests by default
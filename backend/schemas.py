@@ -1,7 +1,8 @@
 # for pydantic models
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import Optional
+from datetime import datetime
 
 class Token(BaseModel):
     """Schema for token response."""
@@ -18,9 +19,8 @@ class UserOut(BaseModel):
     username: str
     email: str
 
-    class Config:
-        """Configuration that allows conversion from SQLAlchemy models."""
-        from_attributes = True
+    # Read straight from SQLAlchemy model attributes, no intermediate dict
+    model_config = ConfigDict(from_attributes=True)
 
 class UserCreate(BaseModel):
     """Schema for registration requests."""
@@ -39,9 +39,13 @@ class UserResponse(BaseModel):
     username: str
     email: str
 
-    class Config:
-        """Configuration that allows conversion from SQLAlchemy models."""
-        from_attributes = True
+    # Read straight from SQLAlchemy model attributes, no intermediate dict
+    model_config = ConfigDict(from_attributes=True)
+
+class UserPage(BaseModel):
+    """Schema for one page of users. Pass next_cursor back as ?cursor= for the next page."""
+    items: list[UserResponse]
+    next_cursor: Optional[int] = None
 
 class UserUpdate(BaseModel):
     """Schema for updating user information."""
@@ -63,15 +67,17 @@ class EventResponse(BaseModel):
     id: int
     title: str
     description: Optional[str] = None
-    start_time: str  # ISO format date-time string
-    end_time: str  # ISO format date-time string
+    start_time: datetime  # Serialised as an ISO format date-time string
+    end_time: datetime
     location: Optional[str] = None
-    created_at: str  # ISO format date-time string
-    updated_at: str  # ISO format date-time string
+    created_at: datetime
+    updated_at: datetime
     owner_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+# Validates a whole list of ORM events and dumps it straight to JSON bytes in one pass
+EventResponseList = TypeAdapter(list[EventResponse])
 
 class EventUpdate(BaseModel):
     """Schema for updating an event."""
@@ -81,5 +87,4 @@ class EventUpdate(BaseModel):
     end_time: Optional[str] = None  # ISO format date-time string
     location: Optional[str] = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,13 +1,21 @@
-import sys
 import os
 from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from sqlalchemy import or_
+from sqlalchemy import insert, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-# This file assumes it's being imported after the working directory has been changed to backend
-from backend.app.models.user import User
-from backend.app.models.events import Event
-from backend.app.utils.auth import get_password_hash
+# Imported by seed_runner once backend/ is on sys.path, so the app's own absolute imports resolve
+from app.models.user import User
+from app.models.events import Event
+from app.utils.auth import get_password_hash
+
+# SEED_VERBOSE=1 prints a line per user/event; otherwise just one summary line each
+VERBOSE = os.environ.get("SEED_VERBOSE", "0") == "1"
+
+# ON CONFLICT DO NOTHING lives on the dialect-specific insert constructs
+_INSERT_BY_DIALECT = {"postgresql": pg_insert, "sqlite": sqlite_insert}
 
 def create_seed_users(db: Session) -> list[User]:
     """Create seed users for development."""
@@ -17,94 +25,126 @@ def create_seed_users(db: Session) -> list[User]:
         {"username": "developer", "name": "Developer User", "email": "dev@whenworks.dev", "password": "dev123"}
     ]
     
-    created_users = []
-    for user_data in seed_users:
-        # Check if user already exists by email OR username
-        existing_user = db.query(User).filter(
-            or_(
-                User.email == user_data["email"],
-                User.username == user_data["username"]
-            )
-        ).first()
-        
-        if existing_user:
-            print(f"User {user_data['username']} ({user_data['email']}) already exists")
-            created_users.append(existing_user)
-            continue
-            
-        user = User(
-            username=user_data["username"],
-            name=user_data["name"],
-            email=user_data["email"],
-            hashed_password=get_password_hash(user_data["password"])
+    # One SELECT for every seed user that already exists by email OR username
+    existing_users = db.query(User).filter(
+        or_(
+            User.email.in_([user_data["email"] for user_data in seed_users]),
+            User.username.in_([user_data["username"] for user_data in seed_users])
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        created_users.append(user)
-        print(f"✅ Created user: {user.name} ({user.email})")
+    ).all()
+    taken = {user.email for user in existing_users} | {user.username for user in existing_users}
+    if VERBOSE:
+        for user in existing_users:
+            print(f"User {user.username} ({user.email}) already exists")
     
-    return created_users
+    # Only hash passwords for users we are actually going to insert
+    new_users = [
+        user_data for user_data in seed_users
+        if user_data["email"] not in taken and user_data["username"] not in taken
+    ]
+    # bcrypt releases the GIL while it hashes, so a thread pool spreads the hashes
+    # across cores without a process pool's start-up and pickling cost
+    with ThreadPoolExecutor() as executor:
+        hashed_passwords = executor.map(get_password_hash, [user_data["password"] for user_data in new_users])
+        new_rows = [
+            {
+                "username": user_data["username"],
+                "name": user_data["name"],
+                "email": user_data["email"],
+                "hashed_password": hashed_password
+            }
+            for user_data, hashed_password in zip(new_users, hashed_passwords)
+        ]
+    
+    created_users = []
+    if new_rows:
+        # A single multi-row INSERT; ON CONFLICT covers a user created since the SELECT,
+        # and RETURNING hands back the new rows without a refresh per user
+        dialect_insert = _INSERT_BY_DIALECT.get(db.get_bind().dialect.name, pg_insert)
+        created_users = db.scalars(
+            dialect_insert(User).values(new_rows).on_conflict_do_nothing().returning(User)
+        ).all()
+        if VERBOSE:
+            for user in created_users:
+                print(f"✅ Created user: {user.name} ({user.email})")
+    print(f"Users: {len(created_users)} created, {len(existing_users)} already existed")
+    
+    # Return users in seed order, whether they were just created or already existed
+    by_key = {key: user for user in (*existing_users, *created_users) for key in (user.email, user.username)}
+    ordered = (by_key.get(user_data["email"]) or by_key.get(user_data["username"]) for user_data in seed_users)
+    return [user for user in ordered if user is not None]
 
 def create_seed_events(db: Session, users: list[User]) -> list[Event]:
     """Create seed events for development."""
     if not users:
         return []
     
+    # Owners by username rather than list position; fall back to the first user if one is missing
+    owner_ids = {user.username: user.id for user in users}
+    default_owner_id = users[0].id
+    
+    # One clock read, so every event is offset from the same instant
+    now = datetime.utcnow()
     seed_events = [
         {
             "title": "Team Standup",
             "description": "Daily team standup meeting",
-            "start_time": datetime.utcnow() + timedelta(hours=1),
-            "end_time": datetime.utcnow() + timedelta(hours=1, minutes=30),
+            "start_time": now + timedelta(hours=1),
+            "end_time": now + timedelta(hours=1, minutes=30),
             "location": "Conference Room A",
-            "owner_id": users[0].id
+            "owner_id": owner_ids.get("admin", default_owner_id)
         },
         {
             "title": "Project Planning",
             "description": "Sprint planning for Q4",
-            "start_time": datetime.utcnow() + timedelta(days=1),
-            "end_time": datetime.utcnow() + timedelta(days=1, hours=2),
+            "start_time": now + timedelta(days=1),
+            "end_time": now + timedelta(days=1, hours=2),
             "location": "Virtual",
-            "owner_id": users[1].id if len(users) > 1 else users[0].id
+            "owner_id": owner_ids.get("testuser", default_owner_id)
         },
         {
             "title": "Code Review",
             "description": "Review new feature implementation",
-            "start_time": datetime.utcnow() + timedelta(days=2),
-            "end_time": datetime.utcnow() + timedelta(days=2, hours=1),
+            "start_time": now + timedelta(days=2),
+            "end_time": now + timedelta(days=2, hours=1),
             "location": "Dev Room",
-            "owner_id": users[2].id if len(users) > 2 else users[0].id
+            "owner_id": owner_ids.get("developer", default_owner_id)
         }
     ]
     
-    created_events = []
-    for event_data in seed_events:
-        existing_event = db.query(Event).filter(
-            Event.title == event_data["title"],
-            Event.owner_id == event_data["owner_id"]
-        ).first()
-        
-        if existing_event:
-            print(f"Event '{event_data['title']}' already exists")
-            created_events.append(existing_event)
-            continue
-            
-        event = Event(**event_data)
-        db.add(event)
-        db.commit()
-        db.refresh(event)
-        created_events.append(event)
-        print(f"✅ Created event: {event.title}")
+    # One SELECT for every seed event that already exists, matched on (title, owner_id)
+    existing_events = db.query(Event).filter(
+        tuple_(Event.title, Event.owner_id).in_(
+            [(event_data["title"], event_data["owner_id"]) for event_data in seed_events]
+        )
+    ).all()
+    existing_keys = {(event.title, event.owner_id) for event in existing_events}
+    if VERBOSE:
+        for event in existing_events:
+            print(f"Event '{event.title}' already exists")
+    
+    new_rows = [
+        event_data
+        for event_data in seed_events
+        if (event_data["title"], event_data["owner_id"]) not in existing_keys
+    ]
+    new_events = []
+    if new_rows:
+        # ORM bulk INSERT (the 2.x form of bulk_insert_mappings): one batched statement,
+        # with RETURNING so we still get Event objects back without a refresh per row
+        new_events = db.scalars(insert(Event).returning(Event), new_rows).all()
+        if VERBOSE:
+            for event in new_events:
+                print(f"✅ Created event: {event.title}")
+    print(f"Events: {len(new_events)} created, {len(existing_events)} already existed")
     
-    return created_events
+    return [*existing_events, *new_events]
 
 def seed_development_database(db: Session):
     """Main function to seed the database."""
-    try:
+    # One transaction for the whole seed: a single COMMIT at the end, and any
+    # failure rolls back users and events together
+    with db.begin():
         users = create_seed_users(db)
         events = create_seed_events(db, users)
-        return {"users": len(users), "events": len(events)}
-    except Exception as e:
-        db.rollback()
-        raise
+    return {"users": len(users), "events": len(events)}
@@ -2,27 +2,33 @@
 import sys
 import os
 
-# Add backend to path and change to backend directory
-backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'backend')
-sys.path.insert(0, backend_path)
-os.chdir(backend_path)
-
-# Now imports should work (from backend directory context)
-from backend.database import SessionLocal
-from development_data import seed_development_database
+BACKEND_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'backend')
 
 def main():
     print("🌱 Seeding development database...")
-    
-    db = SessionLocal()
+
+    # The backend modules import each other as top-level packages (database, app.*),
+    # and settings read .env files and relative SQLite paths from the working directory.
+    # Set both up here rather than at import time, and restore the cwd afterwards.
+    if BACKEND_PATH not in sys.path:
+        sys.path.insert(0, BACKEND_PATH)
+    original_cwd = os.getcwd()
+    os.chdir(BACKEND_PATH)
     try:
-        result = seed_development_database(db)
-        print(f"✅ Database seeding completed! Created {result['users']} users and {result['events']} events")
-    except Exception as e:
-        print(f"❌ Seeding failed: {e}")
-        return 1
+        from database import SessionLocal
+        from development_data import seed_development_database
+
+        db = SessionLocal()
+        try:
+            result = seed_development_database(db)
+            print(f"✅ Database seeding completed! Created {result['users']} users and {result['events']} events")
+        except Exception as e:
+            print(f"❌ Seeding failed: {e}")
+            return 1
+        finally:
+            db.close()
     finally:
-        db.close()
+        os.chdir(original_cwd)
     return 0
 
 if __name__ == "__main__":